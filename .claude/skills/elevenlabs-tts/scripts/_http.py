@@ -0,0 +1,80 @@
+"""
+Persistent HTTPS connection to the ElevenLabs API.
+
+Requests made from the same process share one keep-alive connection, so only
+the first one pays for the TCP and TLS handshake.
+
+Usage:
+    response = request("GET", "/v1/voices", headers=api_headers(api_key), timeout=30)
+    data = response.read()
+"""
+
+import atexit
+import functools
+import http.client
+from collections.abc import Mapping
+from types import MappingProxyType
+
+HOST = "api.elevenlabs.io"
+
+_conn: http.client.HTTPSConnection | None = None
+
+
+def _close() -> None:
+    if _conn is not None:
+        _conn.close()
+
+
+atexit.register(_close)
+
+
+@functools.lru_cache(maxsize=8)
+def api_headers(api_key: str, accept: str = "application/json") -> Mapping[str, str]:
+    """
+    Return the read-only auth and Accept headers for api_key.
+
+    Built once per key and Accept value. Extend with {**api_headers(...), ...}
+    for per-request headers such as Content-Type.
+    """
+    return MappingProxyType({"xi-api-key": api_key, "Accept": accept})
+
+
+def request(
+    method: str,
+    path: str,
+    body=None,
+    headers: Mapping[str, str] | None = None,
+    timeout: float = 60,
+) -> http.client.HTTPResponse:
+    """
+    Send a request over the shared connection and return the response.
+
+    body may be bytes or a zero-argument callable returning an iterable of
+    bytes, so a streamed body can be regenerated if a reused connection turns
+    out to have been closed by the server. The response must be read fully
+    before the next request is made.
+    """
+    global _conn
+
+    while True:
+        if _conn is None:
+            _conn = http.client.HTTPSConnection(HOST, timeout=timeout)
+        reused = _conn.sock is not None
+
+        _conn.timeout = timeout
+        if reused:
+            _conn.sock.settimeout(timeout)
+
+        try:
+            _conn.request(
+                method,
+                path,
+                body=body() if callable(body) else body,
+                headers=headers or {},
+            )
+            return _conn.getresponse()
+        except ConnectionError:
+            _conn.close()
+            _conn = None
+            if not reused:
+                raise
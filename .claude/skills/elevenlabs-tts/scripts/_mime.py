@@ -0,0 +1,18 @@
+"""
+Audio MIME type lookup shared by the ElevenLabs upload scripts.
+"""
+
+MIME_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+
+def get_mime_type(file_path: str) -> str:
+    """Get MIME type from file extension."""
+    # Slice from the last dot rather than building a Path; anything that
+    # is not a known suffix falls through to the default anyway
+    return MIME_TYPES.get(file_path[file_path.rfind("."):].lower(), "audio/mpeg")
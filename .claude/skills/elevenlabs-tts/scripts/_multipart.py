@@ -0,0 +1,112 @@
+"""
+Streaming multipart/form-data encoder for the ElevenLabs scripts.
+
+Audio samples are read from disk in fixed-size chunks while the request is
+being sent, so memory use stays constant regardless of file size.
+
+Usage:
+    boundary = make_boundary()
+    body = multipart_iter(boundary, fields, files)
+    length = multipart_length(boundary, fields, files)
+"""
+
+import os
+import secrets
+
+# Each chunk becomes one socket write, so keep it large enough to amortize
+# syscall overhead on fast links
+CHUNK_SIZE = 1 << 20
+
+_CRLF = b"\r\n"
+_DASHES = b"--"
+
+# Encoded "Content-Type: ..." lines, keyed by MIME type
+_CONTENT_TYPE_LINES: dict[str, bytes] = {}
+
+
+def make_boundary() -> str:
+    """Return a random boundary, so it cannot collide with part contents."""
+    return secrets.token_hex(16)
+
+
+def _content_type_line(content_type: str) -> bytes:
+    line = _CONTENT_TYPE_LINES.get(content_type)
+    if line is None:
+        line = _CONTENT_TYPE_LINES[content_type] = f"Content-Type: {content_type}".encode()
+    return line
+
+
+def _part_header(
+    boundary: bytes,
+    name: str,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> bytes:
+    """Encode the boundary line and headers that precede a part's content."""
+    disposition = f'Content-Disposition: form-data; name="{name}"'
+    if filename is not None:
+        disposition += f'; filename="{filename}"'
+
+    lines = [_DASHES + boundary, disposition.encode()]
+    if content_type is not None:
+        lines.append(_content_type_line(content_type))
+    lines.append(_CRLF)
+
+    return _CRLF.join(lines)
+
+
+def _closing(boundary: bytes) -> bytes:
+    return _DASHES + boundary + _DASHES + _CRLF
+
+
+def multipart_length(
+    boundary: str,
+    fields: list[tuple[str, str]],
+    files: list[tuple[str, str, str, int]],
+) -> int:
+    """
+    Compute the exact size of the body produced by multipart_iter.
+
+    Each file entry carries its size as a fourth element, so callers that
+    already stat'ed the file do not stat it again here.
+    """
+    boundary = boundary.encode()
+    length = len(_closing(boundary))
+
+    for name, value in fields:
+        length += len(_part_header(boundary, name)) + len(value.encode()) + 2
+
+    for name, file_path, mime_type, size in files:
+        header = _part_header(boundary, name, os.path.basename(file_path), mime_type)
+        length += len(header) + size + 2
+
+    return length
+
+
+def multipart_iter(
+    boundary: str,
+    fields: list[tuple[str, str]],
+    files: list[tuple[str, str, str, int]],
+):
+    """
+    Yield a multipart/form-data body piece by piece.
+
+    fields is a list of (name, value) pairs and files a list of
+    (name, file_path, mime_type, size) tuples. File contents are streamed in
+    CHUNK_SIZE blocks.
+    """
+    boundary = boundary.encode()
+
+    for name, value in fields:
+        yield _part_header(boundary, name)
+        yield value.encode()
+        yield _CRLF
+
+    for name, file_path, mime_type, _ in files:
+        yield _part_header(boundary, name, os.path.basename(file_path), mime_type)
+        with open(file_path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+        yield _CRLF
+
+    yield _closing(boundary)
@@ -18,10 +18,10 @@ import json
 import os
 import sys
 import time
-import urllib.request
-import urllib.error
 from pathlib import Path
 
+import _http
+
 
 def get_mime_type(file_path: str) -> str:
     """Get MIME type from file extension."""
@@ -54,8 +54,6 @@ def create_dubbing_project(
     if not os.path.exists(file_path):
         return {"success": False, "error": f"File not found: {file_path}"}
 
-    url = "https://api.elevenlabs.io/v1/dubbing"
-
     # Build multipart form data
     boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
 
@@ -100,29 +98,29 @@ def create_dubbing_project(
     body = b"\r\n".join(body_parts)
 
     headers = {
-        "xi-api-key": api_key,
-        "Accept": "application/json",
+        **_http.api_headers(api_key),
         "Content-Type": f"multipart/form-data; boundary={boundary}",
     }
 
     try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result = json.loads(response.read().decode("utf-8"))
-
-            return {
-                "success": True,
-                "dubbing_id": result.get("dubbing_id"),
-                "expected_duration": result.get("expected_duration_sec"),
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("detail", {}).get("message", error_body)
-        except (json.JSONDecodeError, TypeError):
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
+        response = _http.request("POST", "/v1/dubbing", body=body, headers=headers, timeout=120)
+
+        if response.status >= 400:
+            error_body = response.read().decode("utf-8")
+            try:
+                error_json = json.loads(error_body)
+                error_msg = error_json.get("detail", {}).get("message", error_body)
+            except (json.JSONDecodeError, TypeError):
+                error_msg = error_body
+            return {"success": False, "error": f"API error ({response.status}): {error_msg}"}
+
+        result = json.loads(response.read())
+
+        return {
+            "success": True,
+            "dubbing_id": result.get("dubbing_id"),
+            "expected_duration": result.get("expected_duration_sec"),
+        }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -134,23 +132,24 @@ def get_dubbing_status(dubbing_id: str, api_key: str | None = None) -> dict:
     if not api_key:
         return {"success": False, "error": "ELEVENLABS_API_KEY not set"}
 
-    url = f"https://api.elevenlabs.io/v1/dubbing/{dubbing_id}"
-
-    headers = {
-        "xi-api-key": api_key,
-        "Accept": "application/json",
-    }
-
     try:
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            return {
-                "success": True,
-                "status": result.get("status"),
-                "target_languages": result.get("target_languages", []),
-                "error": result.get("error"),
-            }
+        response = _http.request(
+            "GET",
+            f"/v1/dubbing/{dubbing_id}",
+            headers=_http.api_headers(api_key),
+            timeout=30,
+        )
+        response_body = response.read()
+        if response.status >= 400:
+            return {"success": False, "error": f"HTTP Error {response.status}: {response.reason}"}
+
+        result = json.loads(response_body)
+        return {
+            "success": True,
+            "status": result.get("status"),
+            "target_languages": result.get("target_languages", []),
+            "error": result.get("error"),
+        }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -167,19 +166,20 @@ def download_dubbed_file(
     if not api_key:
         return {"success": False, "error": "ELEVENLABS_API_KEY not set"}
 
-    url = f"https://api.elevenlabs.io/v1/dubbing/{dubbing_id}/audio/{language_code}"
-
-    headers = {
-        "xi-api-key": api_key,
-        "Accept": "audio/mpeg",
-    }
-
     try:
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=300) as response:
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-            return {"success": True, "output": output_path}
+        response = _http.request(
+            "GET",
+            f"/v1/dubbing/{dubbing_id}/audio/{language_code}",
+            headers=_http.api_headers(api_key, "audio/mpeg"),
+            timeout=300,
+        )
+        response_body = response.read()
+        if response.status >= 400:
+            return {"success": False, "error": f"HTTP Error {response.status}: {response.reason}"}
+
+        with open(output_path, "wb") as f:
+            f.write(response_body)
+        return {"success": True, "output": output_path}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
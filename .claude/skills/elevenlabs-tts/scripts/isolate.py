@@ -17,22 +17,10 @@ import argparse
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
-from pathlib import Path
-
-
-def get_mime_type(file_path: str) -> str:
-    """Get MIME type from file extension."""
-    ext = Path(file_path).suffix.lower()
-    mime_types = {
-        ".mp3": "audio/mpeg",
-        ".wav": "audio/wav",
-        ".m4a": "audio/mp4",
-        ".ogg": "audio/ogg",
-        ".flac": "audio/flac",
-    }
-    return mime_types.get(ext, "audio/mpeg")
+
+import _http
+from _mime import get_mime_type
+from _multipart import make_boundary, multipart_iter, multipart_length
 
 
 def isolate_audio(
@@ -46,59 +34,48 @@ def isolate_audio(
     if not api_key:
         return {"success": False, "error": "ELEVENLABS_API_KEY environment variable not set"}
 
-    if not os.path.exists(audio_path):
+    try:
+        audio_size = os.stat(audio_path).st_size
+    except FileNotFoundError:
         return {"success": False, "error": f"Audio file not found: {audio_path}"}
 
-    url = "https://api.elevenlabs.io/v1/audio-isolation"
-
     # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    filename = Path(audio_path).name
-    mime_type = get_mime_type(audio_path)
-
-    with open(audio_path, "rb") as f:
-        audio_data = f.read()
-
-    body_parts = []
-
-    # Add audio file
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(f'Content-Disposition: form-data; name="audio"; filename="{filename}"'.encode())
-    body_parts.append(f"Content-Type: {mime_type}".encode())
-    body_parts.append(b"")
-    body_parts.append(audio_data)
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
+    boundary = make_boundary()
 
-    body = b"\r\n".join(body_parts)
+    files = [("audio", audio_path, get_mime_type(audio_path), audio_size)]
 
     headers = {
-        "xi-api-key": api_key,
-        "Accept": "audio/mpeg",
+        **_http.api_headers(api_key, "audio/mpeg"),
         "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(multipart_length(boundary, [], files)),
     }
 
     try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=300) as response:
-            # Save the isolated audio
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-
-            return {
-                "success": True,
-                "output": output_path,
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("detail", {}).get("message", error_body)
-        except (json.JSONDecodeError, TypeError):
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
+        response = _http.request(
+            "POST",
+            "/v1/audio-isolation",
+            body=lambda: multipart_iter(boundary, [], files),
+            headers=headers,
+            timeout=300,
+        )
+
+        if response.status >= 400:
+            error_body = response.read().decode("utf-8")
+            try:
+                error_json = json.loads(error_body)
+                error_msg = error_json.get("detail", {}).get("message", error_body)
+            except (json.JSONDecodeError, TypeError):
+                error_msg = error_body
+            return {"success": False, "error": f"API error ({response.status}): {error_msg}"}
+
+        # Save the isolated audio
+        with open(output_path, "wb") as f:
+            f.write(response.read())
+
+        return {
+            "success": True,
+            "output": output_path,
+        }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
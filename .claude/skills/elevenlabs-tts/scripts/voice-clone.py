@@ -20,22 +20,19 @@ import argparse
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
-from pathlib import Path
-
-
-def get_mime_type(file_path: str) -> str:
-    """Get MIME type from file extension."""
-    ext = Path(file_path).suffix.lower()
-    mime_types = {
-        ".mp3": "audio/mpeg",
-        ".wav": "audio/wav",
-        ".m4a": "audio/mp4",
-        ".ogg": "audio/ogg",
-        ".flac": "audio/flac",
-    }
-    return mime_types.get(ext, "audio/mpeg")
+from concurrent.futures import ThreadPoolExecutor
+
+import _http
+from _mime import get_mime_type
+from _multipart import make_boundary, multipart_iter, multipart_length
+
+
+def _file_size(file_path: str) -> int | None:
+    """Return the size of file_path from a single stat, or None if missing."""
+    try:
+        return os.stat(file_path).st_size
+    except FileNotFoundError:
+        return None
 
 
 def clone_voice(
@@ -51,85 +48,67 @@ def clone_voice(
     if not api_key:
         return {"success": False, "error": "ELEVENLABS_API_KEY environment variable not set"}
 
-    # Validate files
-    for file_path in files:
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
-
     if len(files) > 25:
         return {"success": False, "error": "Maximum 25 audio samples allowed"}
 
-    url = "https://api.elevenlabs.io/v1/voices/add"
+    # Validate files, checking them concurrently to overlap filesystem latency
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        sizes = list(executor.map(_file_size, files))
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    body_parts = []
-
-    # Add name
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="name"')
-    body_parts.append(b"")
-    body_parts.append(name.encode())
-
-    # Add files
-    for file_path in files:
-        filename = Path(file_path).name
-        mime_type = get_mime_type(file_path)
+    for file_path, size in zip(files, sizes):
+        if size is None:
+            return {"success": False, "error": f"File not found: {file_path}"}
 
-        with open(file_path, "rb") as f:
-            file_data = f.read()
+    # Build multipart form data
+    boundary = make_boundary()
 
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(f'Content-Disposition: form-data; name="files"; filename="{filename}"'.encode())
-        body_parts.append(f"Content-Type: {mime_type}".encode())
-        body_parts.append(b"")
-        body_parts.append(file_data)
+    fields = [("name", name)]
 
     # Add optional description
     if description:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="description"')
-        body_parts.append(b"")
-        body_parts.append(description.encode())
+        fields.append(("description", description))
 
     # Add optional labels
     if labels:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="labels"')
-        body_parts.append(b"")
-        body_parts.append(json.dumps(labels).encode())
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
+        fields.append(("labels", json.dumps(labels)))
 
-    body = b"\r\n".join(body_parts)
+    multipart_files = [
+        ("files", file_path, get_mime_type(file_path), size)
+        for file_path, size in zip(files, sizes)
+    ]
 
     headers = {
-        "xi-api-key": api_key,
-        "Accept": "application/json",
+        **_http.api_headers(api_key),
         "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(multipart_length(boundary, fields, multipart_files)),
     }
 
     try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result = json.loads(response.read().decode("utf-8"))
-
-            return {
-                "success": True,
-                "voice_id": result.get("voice_id"),
-                "name": name,
-                "samples": len(files),
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("detail", {}).get("message", error_body)
-        except (json.JSONDecodeError, TypeError):
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
+        response = _http.request(
+            "POST",
+            "/v1/voices/add",
+            body=lambda: multipart_iter(boundary, fields, multipart_files),
+            headers=headers,
+            timeout=120,
+        )
+
+        if response.status >= 400:
+            error_body = response.read().decode("utf-8")
+            try:
+                error_json = json.loads(error_body)
+                error_msg = error_json.get("detail", {}).get("message", error_body)
+            except (json.JSONDecodeError, TypeError):
+                error_msg = error_body
+            return {"success": False, "error": f"API error ({response.status}): {error_msg}"}
+
+        result = json.loads(response.read())
+
+        return {
+            "success": True,
+            "voice_id": result.get("voice_id"),
+            "name": name,
+            "samples": len(files),
+        }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
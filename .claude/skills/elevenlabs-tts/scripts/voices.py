@@ -18,8 +18,22 @@ import argparse
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
+
+import _http
+
+# Shared stand-in for voices without labels, so none is allocated per voice
+_EMPTY_LABELS: dict = {}
+
+
+def _search_text(voice: dict) -> str:
+    """Lowercased name and labels, NUL-separated so a match cannot span fields."""
+    labels = voice.get("labels") or _EMPTY_LABELS
+    return "\0".join((
+        voice.get("name", ""),
+        labels.get("gender", ""),
+        labels.get("accent", ""),
+        labels.get("description", ""),
+    )).lower()
 
 
 def list_voices(
@@ -32,44 +46,32 @@ def list_voices(
     if not api_key:
         return {"success": False, "error": "ELEVENLABS_API_KEY environment variable not set"}
 
-    url = "https://api.elevenlabs.io/v1/voices"
-
-    headers = {
-        "xi-api-key": api_key,
-        "Accept": "application/json",
-    }
-
     try:
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
-
-            voices = result.get("voices", [])
-
-            # Filter if specified
-            if filter_text:
-                filter_lower = filter_text.lower()
-                voices = [
-                    v for v in voices
-                    if filter_lower in v.get("name", "").lower()
-                    or filter_lower in v.get("labels", {}).get("gender", "").lower()
-                    or filter_lower in v.get("labels", {}).get("accent", "").lower()
-                    or filter_lower in v.get("labels", {}).get("description", "").lower()
-                ]
-
-            return {
-                "success": True,
-                "voices": voices,
-                "total": len(voices),
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("detail", {}).get("message", error_body)
-        except (json.JSONDecodeError, TypeError):
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
+        response = _http.request("GET", "/v1/voices", headers=_http.api_headers(api_key), timeout=30)
+
+        if response.status >= 400:
+            error_body = response.read().decode("utf-8")
+            try:
+                error_json = json.loads(error_body)
+                error_msg = error_json.get("detail", {}).get("message", error_body)
+            except (json.JSONDecodeError, TypeError):
+                error_msg = error_body
+            return {"success": False, "error": f"API error ({response.status}): {error_msg}"}
+
+        result = json.loads(response.read())
+
+        voices = result.get("voices", [])
+
+        # Filter if specified
+        if filter_text:
+            filter_lower = filter_text.lower()
+            voices = [v for v in voices if filter_lower in _search_text(v)]
+
+        return {
+            "success": True,
+            "voices": voices,
+            "total": len(voices),
+        }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -109,18 +111,23 @@ Examples:
         if args.json:
             print(json.dumps(voices, indent=2))
         else:
-            print(f"Found {result['total']} voice(s):\n")
-            print(f"{'ID':<30} {'Name':<20} {'Gender':<10} {'Accent':<15}")
-            print("-" * 75)
+            rows = [
+                f"Found {result['total']} voice(s):\n",
+                f"{'ID':<30} {'Name':<20} {'Gender':<10} {'Accent':<15}",
+                "-" * 75,
+            ]
 
             for voice in voices:
                 voice_id = voice.get("voice_id", "")[:28]
                 name = voice.get("name", "")[:18]
-                labels = voice.get("labels", {})
+                labels = voice.get("labels") or _EMPTY_LABELS
                 gender = labels.get("gender", "")[:8]
                 accent = labels.get("accent", "")[:13]
 
-                print(f"{voice_id:<30} {name:<20} {gender:<10} {accent:<15}")
+                rows.append(f"{voice_id:<30} {name:<20} {gender:<10} {accent:<15}")
+
+            # Write the table in one call rather than one per voice
+            print("\n".join(rows))
 
         sys.exit(0)
     else:
@@ -12,17 +12,26 @@ Usage:
 Requirements:
     - GOOGLE_API_KEY environment variable
     - Python 3.8+
+    - ijson (optional, parses large responses incrementally)
 """
 
 import argparse
-import base64
+import atexit
+import functools
+import http.client
 import json
 import os
+import re
 import sys
 import time
-import urllib.request
-import urllib.error
 from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import urlsplit
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 MODELS = {
     "flash": "gemini-3-flash-preview",
@@ -43,21 +52,126 @@ MIME_TYPES = {
     ".3gpp": "video/3gpp",
 }
 
+YOUTUBE_URL_RE = re.compile(r"youtube\.com|youtu\.be")
+
+# Responses larger than this (or of unknown length) are parsed with ijson
+STREAM_PARSE_MIN_BYTES = 1 << 20
+
+# Write uploads in 1 MiB blocks rather than http.client's 8 KiB default
+BLOCK_SIZE = 1 << 20
+
+_connections: dict[str, http.client.HTTPSConnection] = {}
+
+
+def _close_connections() -> None:
+    for conn in _connections.values():
+        conn.close()
+
+
+atexit.register(_close_connections)
 
+
+def _request(
+    method: str,
+    url: str,
+    body: bytes | BinaryIO | None = None,
+    headers: dict | None = None,
+    timeout: float = 60,
+) -> http.client.HTTPResponse:
+    """
+    Send a request over a keep-alive connection cached per host.
+
+    body may be bytes or a binary file opened at its start; files are streamed
+    and need an explicit Content-Length header. A reused connection that the
+    server has since closed is re-opened once. The response must be read
+    fully before the next request to the same host.
+    """
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+    while True:
+        conn = _connections.get(parts.netloc)
+        if conn is None:
+            conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout, blocksize=BLOCK_SIZE)
+            _connections[parts.netloc] = conn
+        reused = conn.sock is not None
+
+        conn.timeout = timeout
+        if reused:
+            conn.sock.settimeout(timeout)
+
+        if hasattr(body, "seek"):
+            body.seek(0)
+
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            return conn.getresponse()
+        except ConnectionError:
+            conn.close()
+            del _connections[parts.netloc]
+            if not reused:
+                raise
+
+
+def _parse_response_streaming(response: http.client.HTTPResponse) -> dict:
+    """
+    Extract only the fields analyze_video reads from a generateContent
+    response, without building the full object tree.
+
+    Returns a dict shaped like the API response, holding the text parts of the
+    first candidate and the top-level usageMetadata counts.
+    """
+    candidates = 0
+    texts = []
+    usage = {}
+
+    for prefix, event, value in ijson.parse(response):
+        if prefix == "candidates.item" and event == "start_map":
+            candidates += 1
+        elif prefix == "candidates.item.content.parts.item.text" and candidates == 1:
+            texts.append(value)
+        elif prefix.startswith("usageMetadata.") and event == "number" and prefix.count(".") == 1:
+            usage[prefix.split(".", 1)[1]] = value
+
+    result = {"usageMetadata": usage}
+    if candidates:
+        result["candidates"] = [{"content": {"parts": [{"text": t} for t in texts]}}]
+    return result
+
+
+@functools.lru_cache(maxsize=8)
 def is_youtube_url(source: str) -> bool:
     """Check if source is a YouTube URL."""
-    return "youtube.com" in source or "youtu.be" in source
+    return YOUTUBE_URL_RE.search(source) is not None
 
 
 def get_mime_type(file_path: str) -> str:
     """Get MIME type from file extension."""
-    ext = Path(file_path).suffix.lower()
-    return MIME_TYPES.get(ext, "video/mp4")
+    # Slice from the last dot rather than building a Path; anything that
+    # is not a known suffix falls through to the default anyway
+    return MIME_TYPES.get(file_path[file_path.rfind("."):].lower(), "video/mp4")
 
 
 def upload_file(file_path: str, api_key: str) -> dict:
     """Upload a file using the Files API."""
-    file_size = os.path.getsize(file_path)
+    try:
+        f = open(file_path, "rb")
+    except OSError as e:
+        return {"success": False, "error": f"Failed to open file: {e}"}
+
+    with f:
+        return _upload_resumable(f, file_path, api_key)
+
+
+def _upload_resumable(f: BinaryIO, file_path: str, api_key: str) -> dict:
+    """
+    Run the two-step resumable upload for an open file.
+
+    The size announced in X-Goog-Upload-Header-Content-Length and the
+    Content-Length of the streamed body both come from this one fstat, so
+    they always agree and the body is never sent chunked.
+    """
+    file_size = os.fstat(f.fileno()).st_size
     mime_type = get_mime_type(file_path)
     display_name = Path(file_path).name
 
@@ -73,18 +187,18 @@ def upload_file(file_path: str, api_key: str) -> dict:
     init_data = json.dumps({"file": {"display_name": display_name}}).encode("utf-8")
 
     try:
-        req = urllib.request.Request(init_url, data=init_data, headers=init_headers, method="POST")
-        with urllib.request.urlopen(req, timeout=60) as response:
-            upload_url = response.headers.get("X-Goog-Upload-URL")
-            if not upload_url:
-                return {"success": False, "error": "No upload URL returned"}
+        response = _request("POST", init_url, body=init_data, headers=init_headers, timeout=60)
+        response.read()
+        if response.status >= 400:
+            return {"success": False, "error": f"Failed to initiate upload: HTTP {response.status} {response.reason}"}
+
+        upload_url = response.headers.get("X-Goog-Upload-URL")
+        if not upload_url:
+            return {"success": False, "error": "No upload URL returned"}
     except Exception as e:
         return {"success": False, "error": f"Failed to initiate upload: {e}"}
 
     # Step 2: Upload the file content
-    with open(file_path, "rb") as f:
-        file_data = f.read()
-
     upload_headers = {
         "Content-Length": str(file_size),
         "X-Goog-Upload-Offset": "0",
@@ -92,39 +206,49 @@ def upload_file(file_path: str, api_key: str) -> dict:
     }
 
     try:
-        req = urllib.request.Request(upload_url, data=file_data, headers=upload_headers, method="POST")
-        with urllib.request.urlopen(req, timeout=300) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            file_info = result.get("file", {})
-            return {
-                "success": True,
-                "file_uri": file_info.get("uri"),
-                "name": file_info.get("name"),
-                "state": file_info.get("state"),
-            }
+        # http.client streams the file in BLOCK_SIZE writes. socket.sendfile()
+        # is not used: on TLS sockets it falls back to 8 KiB read/send calls.
+        response = _request("POST", upload_url, body=f, headers=upload_headers, timeout=300)
+        response_body = response.read()
+        if response.status >= 400:
+            return {"success": False, "error": f"Failed to upload file: HTTP {response.status} {response.reason}"}
+
+        result = json.loads(response_body)
+        file_info = result.get("file", {})
+        return {
+            "success": True,
+            "file_uri": file_info.get("uri"),
+            "name": file_info.get("name"),
+            "state": file_info.get("state"),
+        }
     except Exception as e:
         return {"success": False, "error": f"Failed to upload file: {e}"}
 
 
 def wait_for_processing(file_name: str, api_key: str, timeout: int = 300) -> dict:
-    """Wait for file processing to complete."""
+    """Wait for file processing to complete, polling with geometric backoff."""
     url = f"https://generativelanguage.googleapis.com/v1beta/{file_name}?key={api_key}"
     start_time = time.time()
+    attempt = 0
 
     while time.time() - start_time < timeout:
         try:
-            req = urllib.request.Request(url, method="GET")
-            with urllib.request.urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                state = result.get("state")
-
-                if state == "ACTIVE":
-                    return {"success": True, "file_uri": result.get("uri")}
-                elif state == "FAILED":
-                    return {"success": False, "error": "File processing failed"}
-
-                # Still processing, wait and retry
-                time.sleep(2)
+            response = _request("GET", url, timeout=30)
+            response_body = response.read()
+            if response.status >= 400:
+                return {"success": False, "error": f"Failed to check file status: HTTP {response.status} {response.reason}"}
+
+            result = json.loads(response_body)
+            state = result.get("state")
+
+            if state == "ACTIVE":
+                return {"success": True, "file_uri": result.get("uri")}
+            elif state == "FAILED":
+                return {"success": False, "error": "File processing failed"}
+
+            # Still processing, back off from 250ms up to 5s between polls
+            time.sleep(min(5.0, 0.25 * 1.5 ** attempt))
+            attempt += 1
         except Exception as e:
             return {"success": False, "error": f"Failed to check file status: {e}"}
 
@@ -156,33 +280,33 @@ def analyze_video(
     if is_youtube_url(source):
         # YouTube URL
         video_part["file_data"] = {"file_uri": source}
-    elif os.path.exists(source):
-        # Local file - check size
-        file_size = os.path.getsize(source)
-
-        if file_size > 20 * 1024 * 1024:  # >20MB, use File API
-            print("Uploading video file...")
-            upload_result = upload_file(source, api_key)
-            if not upload_result["success"]:
-                return upload_result
-
-            # Wait for processing
+    else:
+        # Local file, upload via the File API. Opening it directly doubles as
+        # the existence check, so the path is not stat'ed separately.
+        try:
+            f = open(source, "rb")
+        except FileNotFoundError:
+            return {"success": False, "error": f"Source not found: {source}"}
+        except OSError as e:
+            return {"success": False, "error": f"Failed to open file: {e}"}
+
+        print("Uploading video file...")
+        with f:
+            upload_result = _upload_resumable(f, source, api_key)
+        if not upload_result["success"]:
+            return upload_result
+
+        file_uri = upload_result["file_uri"]
+
+        # Wait for processing, unless the upload is already usable
+        if upload_result["state"] != "ACTIVE":
             print("Processing video...")
             process_result = wait_for_processing(upload_result["name"], api_key)
             if not process_result["success"]:
                 return process_result
+            file_uri = process_result["file_uri"]
 
-            video_part["file_data"] = {"file_uri": process_result["file_uri"]}
-        else:
-            # Small file, use inline data
-            with open(source, "rb") as f:
-                video_data = base64.b64encode(f.read()).decode("utf-8")
-            video_part["inline_data"] = {
-                "mime_type": get_mime_type(source),
-                "data": video_data,
-            }
-    else:
-        return {"success": False, "error": f"Source not found: {source}"}
+        video_part["file_data"] = {"file_uri": file_uri}
 
     # Add video metadata if specified
     video_metadata = {}
@@ -218,17 +342,22 @@ def analyze_video(
     data = json.dumps(payload).encode("utf-8")
 
     try:
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=300) as response:
-            result = json.loads(response.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("error", {}).get("message", error_body)
-        except json.JSONDecodeError:
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
+        response = _request("POST", url, body=data, headers=headers, timeout=300)
+
+        if response.status >= 400:
+            error_body = response.read().decode("utf-8")
+            try:
+                error_json = json.loads(error_body)
+                error_msg = error_json.get("error", {}).get("message", error_body)
+            except json.JSONDecodeError:
+                error_msg = error_body
+            return {"success": False, "error": f"API error ({response.status}): {error_msg}"}
+
+        content_length = response.getheader("Content-Length")
+        if ijson is not None and (content_length is None or int(content_length) > STREAM_PARSE_MIN_BYTES):
+            result = _parse_response_streaming(response)
+        else:
+            result = json.loads(response.read())
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -0,0 +1,154 @@
+"""
+Persistent HTTPS connections for the Kling AI scripts.
+
+Requests to the same host share one keep-alive connection, so only the first
+one pays for the TCP and TLS handshake and later calls, such as status polls,
+reuse it. Each thread gets its own connections, so jobs may run concurrently
+in separate threads.
+
+Usage:
+    with request("GET", url, headers=headers, timeout=30) as response:
+        result = json.loads(response.read())
+    download(result_url, output_path)
+"""
+
+import atexit
+import http.client
+import io
+import os
+import shutil
+import ssl
+import threading
+import urllib.error
+from collections.abc import Mapping
+from urllib.parse import urljoin, urlsplit
+
+# Copy downloads in 1 MiB reads rather than shutil's 64 KiB default
+COPY_BUFSIZE = 1 << 20
+
+# Result files are often served through a redirect to a CDN
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+MAX_REDIRECTS = 5
+
+# Loading the CA store takes tens of milliseconds, so every connection shares
+# one context instead of http.client building a new one per connection
+_SSL_CONTEXT = ssl.create_default_context()
+
+# (thread id, host) -> connection
+_connections: dict[tuple[int, str], http.client.HTTPSConnection] = {}
+
+
+def _close_connections() -> None:
+    for conn in _connections.values():
+        conn.close()
+
+
+atexit.register(_close_connections)
+
+
+def request(
+    method: str,
+    url: str,
+    body: bytes | None = None,
+    headers: Mapping[str, str] | None = None,
+    timeout: float = 60,
+) -> http.client.HTTPResponse:
+    """
+    Send a request over a keep-alive connection cached per thread and host.
+
+    Error statuses raise urllib.error.HTTPError, as urllib.request.urlopen
+    does, with the body already read so the connection stays usable. A reused
+    connection that the server has since closed is re-opened once. The
+    response must be read fully before the next request to the same host.
+    """
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    key = (threading.get_ident(), parts.netloc)
+
+    while True:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout, context=_SSL_CONTEXT)
+            _connections[key] = conn
+        reused = conn.sock is not None
+
+        conn.timeout = timeout
+        if reused:
+            conn.sock.settimeout(timeout)
+
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            break
+        except ConnectionError:
+            conn.close()
+            del _connections[key]
+            if not reused:
+                raise
+
+    if response.status >= 400:
+        error_body = response.read()
+        raise urllib.error.HTTPError(
+            url, response.status, response.reason, response.headers, io.BytesIO(error_body)
+        )
+
+    return response
+
+
+def save_response(response: http.client.HTTPResponse, output_path: str) -> int:
+    """
+    Stream response's body into output_path and return its size in bytes.
+
+    The body is written straight to output_path, with no temporary file or
+    rename. If the transfer fails part-way the partial file is removed, so it
+    is never mistaken for a result. Raises http.client.IncompleteRead if the
+    body ends before its declared length.
+    """
+    with open(output_path, "wb") as f:
+        try:
+            shutil.copyfileobj(response, f, COPY_BUFSIZE)
+            size = f.tell()
+
+            # read(n) reports a body cut short only by returning less data,
+            # so check that all of it arrived
+            if response.length:
+                raise http.client.IncompleteRead(b"", response.length)
+        except BaseException:
+            f.close()
+            try:
+                os.unlink(output_path)
+            except OSError:
+                pass
+            raise
+
+    return size
+
+
+def download(url: str, output_path: str, timeout: float = 300) -> None:
+    """
+    Stream the file at url into output_path over a keep-alive connection.
+
+    Redirects are followed up to MAX_REDIRECTS times. If the transfer fails
+    part-way, nothing is left at output_path and the connection is dropped
+    rather than reused with unread data.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        try:
+            with request("GET", url, timeout=timeout) as response:
+                location = response.getheader("Location")
+                if response.status in REDIRECT_STATUSES and location:
+                    response.read()
+                    url = urljoin(url, location)
+                    continue
+
+                save_response(response, output_path)
+                return
+        except urllib.error.HTTPError:
+            raise
+        except Exception:
+            conn = _connections.pop((threading.get_ident(), urlsplit(url).netloc), None)
+            if conn is not None:
+                conn.close()
+            raise
+
+    raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, None)
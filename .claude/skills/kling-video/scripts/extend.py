@@ -14,6 +14,7 @@ Requirements:
 """
 
 import argparse
+import asyncio
 import base64
 import hashlib
 import hmac
@@ -21,33 +22,78 @@ import json
 import os
 import sys
 import time
-import urllib.request
 import urllib.error
 
+import _http
 
-def generate_jwt(access_key: str, secret_key: str) -> str:
-    """Generate JWT token for Kling API authentication."""
-    now = int(time.time())
 
-    header = {"alg": "HS256", "typ": "JWT"}
-    payload = {"iss": access_key, "exp": now + 1800, "nbf": now - 5}
+# Tokens are valid for TOKEN_TTL seconds and reissued once fewer than
+# TOKEN_REFRESH_MARGIN seconds remain
+TOKEN_TTL = 1800
+TOKEN_REFRESH_MARGIN = 60
+
+# (access_key, secret_key) -> (token, exp)
+_token_cache: dict[tuple[str, str], tuple[str, int]] = {}
+
+# secret_key -> HMAC-SHA256 keyed with it, copied for each signature
+_hmac_templates: dict[str, hmac.HMAC] = {}
+
+
+def _b64_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+# The JWT header never changes, so it is encoded once
+_HEADER_B64 = _b64_encode(b'{"alg":"HS256","typ":"JWT"}')
+
+# Status polls start POLL_INTERVAL_MIN apart and back off by 1.5x up to
+# POLL_INTERVAL_MAX. Rate-limit and server errors double the wait instead,
+# up to POLL_ERROR_INTERVAL_MAX.
+POLL_INTERVAL_MIN = 2.0
+POLL_INTERVAL_MAX = 30.0
+POLL_ERROR_INTERVAL_MAX = 60.0
+
+
+def _hmac_for(secret_key: str) -> hmac.HMAC:
+    """Return a fresh HMAC for secret_key without redoing the key setup."""
+    template = _hmac_templates.get(secret_key)
+    if template is None:
+        template = _hmac_templates[secret_key] = hmac.new(secret_key.encode(), None, hashlib.sha256)
+    return template.copy()
+
 
-    def b64_encode(data: bytes) -> str:
-        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+def generate_jwt(access_key: str, secret_key: str, now: int | None = None) -> str:
+    """Generate JWT token for Kling API authentication."""
+    if now is None:
+        now = int(time.time())
+
+    payload = {"iss": access_key, "exp": now + TOKEN_TTL, "nbf": now - 5}
 
-    header_b64 = b64_encode(json.dumps(header).encode())
-    payload_b64 = b64_encode(json.dumps(payload).encode())
+    header_b64 = _HEADER_B64
+    payload_b64 = _b64_encode(json.dumps(payload, separators=(",", ":")).encode())
 
-    signature = hmac.new(
-        secret_key.encode(),
-        f"{header_b64}.{payload_b64}".encode(),
-        hashlib.sha256
-    ).digest()
-    signature_b64 = b64_encode(signature)
+    mac = _hmac_for(secret_key)
+    mac.update(f"{header_b64}.{payload_b64}".encode())
+    signature = mac.digest()
+    signature_b64 = _b64_encode(signature)
 
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
 
+def _get_jwt(access_key: str, secret_key: str) -> str:
+    """Return a cached JWT for the key pair, minting a new one near expiry."""
+    now = int(time.time())
+    key = (access_key, secret_key)
+
+    cached = _token_cache.get(key)
+    if cached is not None and now + TOKEN_REFRESH_MARGIN < cached[1]:
+        return cached[0]
+
+    token = generate_jwt(access_key, secret_key, now)
+    _token_cache[key] = (token, now + TOKEN_TTL)
+    return token
+
+
 def extend_video(
     video_id: str,
     output_path: str,
@@ -65,7 +111,7 @@ def extend_video(
         return {"success": False, "error": "KLING_API_KEY must be in format ACCESS_KEY:SECRET_KEY"}
 
     access_key, secret_key = api_key.split(":", 1)
-    token = generate_jwt(access_key, secret_key)
+    token = _get_jwt(access_key, secret_key)
 
     # Create extension request
     url = "https://api.klingai.com/v1/videos/video-extend"
@@ -83,11 +129,10 @@ def extend_video(
         "Content-Type": "application/json",
     }
 
-    data = json.dumps(payload).encode()
+    data = json.dumps(payload, separators=(",", ":")).encode()
 
     try:
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
+        with _http.request("POST", url, body=data, headers=headers, timeout=30) as response:
             result = json.loads(response.read().decode("utf-8"))
 
         if result.get("code") != 0:
@@ -104,25 +149,38 @@ def extend_video(
         status_url = f"https://api.klingai.com/v1/videos/video-extend/{task_id}"
         start_time = time.time()
         timeout = 600  # 10 minutes
+        delay = POLL_INTERVAL_MIN
+        last_status = None
 
         while time.time() - start_time < timeout:
-            token = generate_jwt(access_key, secret_key)  # Refresh token
-            headers["Authorization"] = f"Bearer {token}"
-
-            req = urllib.request.Request(status_url, headers=headers, method="GET")
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status_result = json.loads(response.read().decode("utf-8"))
+            headers["Authorization"] = f"Bearer {_get_jwt(access_key, secret_key)}"
+
+            try:
+                with _http.request("GET", status_url, headers=headers, timeout=30) as response:
+                    status_result = json.loads(response.read().decode("utf-8"))
+            except urllib.error.HTTPError as e:
+                # Back off through rate limiting and transient server errors
+                if e.code != 429 and e.code < 500:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, POLL_ERROR_INTERVAL_MAX)
+                continue
 
             task_status = status_result.get("data", {}).get("task_status")
             print(f"Status: {task_status}")
 
+            # Poll quickly again once the task has actually started
+            if task_status == "processing" and last_status == "submitted":
+                delay = POLL_INTERVAL_MIN
+            last_status = task_status
+
             if task_status == "succeed":
                 videos = status_result.get("data", {}).get("task_result", {}).get("videos", [])
                 if videos:
                     video_url = videos[0].get("url")
                     if video_url:
                         # Download video
-                        urllib.request.urlretrieve(video_url, output_path)
+                        _http.download(video_url, output_path)
                         return {
                             "success": True,
                             "output": output_path,
@@ -134,7 +192,8 @@ def extend_video(
             elif task_status == "failed":
                 return {"success": False, "error": "Video extension failed"}
 
-            time.sleep(5)
+            time.sleep(delay)
+            delay = min(delay * 1.5, POLL_INTERVAL_MAX)
 
         return {"success": False, "error": "Timeout waiting for video extension"}
 
@@ -145,6 +204,16 @@ def extend_video(
         return {"success": False, "error": str(e)}
 
 
+async def extend_video_async(*args, **kwargs) -> dict:
+    """
+    Run extend_video in a worker thread.
+
+    Takes the same arguments as extend_video. Lets library callers run several
+    extensions at once with asyncio.gather.
+    """
+    return await asyncio.to_thread(extend_video, *args, **kwargs)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extend videos using Kling AI",
@@ -15,6 +15,7 @@ Requirements:
 """
 
 import argparse
+import asyncio
 import base64
 import hashlib
 import hmac
@@ -22,33 +23,71 @@ import json
 import os
 import sys
 import time
-import urllib.request
 import urllib.error
 
+import _http
+
+
+# Tokens are valid for TOKEN_TTL seconds and reissued once fewer than
+# TOKEN_REFRESH_MARGIN seconds remain
+TOKEN_TTL = 1800
+TOKEN_REFRESH_MARGIN = 60
+
+# (access_key, secret_key) -> (token, exp)
+_token_cache: dict[tuple[str, str], tuple[str, int]] = {}
+
+# secret_key -> HMAC-SHA256 keyed with it, copied for each signature
+_hmac_templates: dict[str, hmac.HMAC] = {}
 
-def generate_jwt(access_key: str, secret_key: str) -> str:
-    """Generate JWT token for Kling API authentication."""
-    now = int(time.time())
 
-    header = {"alg": "HS256", "typ": "JWT"}
-    payload = {"iss": access_key, "exp": now + 1800, "nbf": now - 5}
+def _b64_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
 
-    def b64_encode(data: bytes) -> str:
-        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
 
-    header_b64 = b64_encode(json.dumps(header).encode())
-    payload_b64 = b64_encode(json.dumps(payload).encode())
+# The JWT header never changes, so it is encoded once
+_HEADER_B64 = _b64_encode(b'{"alg":"HS256","typ":"JWT"}')
+
+
+def _hmac_for(secret_key: str) -> hmac.HMAC:
+    """Return a fresh HMAC for secret_key without redoing the key setup."""
+    template = _hmac_templates.get(secret_key)
+    if template is None:
+        template = _hmac_templates[secret_key] = hmac.new(secret_key.encode(), None, hashlib.sha256)
+    return template.copy()
+
+
+def generate_jwt(access_key: str, secret_key: str, now: int | None = None) -> str:
+    """Generate JWT token for Kling API authentication."""
+    if now is None:
+        now = int(time.time())
 
-    signature = hmac.new(
-        secret_key.encode(),
-        f"{header_b64}.{payload_b64}".encode(),
-        hashlib.sha256
-    ).digest()
-    signature_b64 = b64_encode(signature)
+    payload = {"iss": access_key, "exp": now + TOKEN_TTL, "nbf": now - 5}
+
+    header_b64 = _HEADER_B64
+    payload_b64 = _b64_encode(json.dumps(payload, separators=(",", ":")).encode())
+
+    mac = _hmac_for(secret_key)
+    mac.update(f"{header_b64}.{payload_b64}".encode())
+    signature = mac.digest()
+    signature_b64 = _b64_encode(signature)
 
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
 
+def _get_jwt(access_key: str, secret_key: str) -> str:
+    """Return a cached JWT for the key pair, minting a new one near expiry."""
+    now = int(time.time())
+    key = (access_key, secret_key)
+
+    cached = _token_cache.get(key)
+    if cached is not None and now + TOKEN_REFRESH_MARGIN < cached[1]:
+        return cached[0]
+
+    token = generate_jwt(access_key, secret_key, now)
+    _token_cache[key] = (token, now + TOKEN_TTL)
+    return token
+
+
 def get_task_status(
     task_id: str,
     task_type: str = "text2video",
@@ -64,7 +103,7 @@ def get_task_status(
         return {"success": False, "error": "KLING_API_KEY must be in format ACCESS_KEY:SECRET_KEY"}
 
     access_key, secret_key = api_key.split(":", 1)
-    token = generate_jwt(access_key, secret_key)
+    token = _get_jwt(access_key, secret_key)
 
     # Build URL based on task type
     url = f"https://api.klingai.com/v1/videos/{task_type}/{task_id}"
@@ -75,8 +114,7 @@ def get_task_status(
     }
 
     try:
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, timeout=30) as response:
+        with _http.request("GET", url, headers=headers, timeout=30) as response:
             result = json.loads(response.read().decode("utf-8"))
 
         if result.get("code") != 0:
@@ -114,6 +152,16 @@ def get_task_status(
         return {"success": False, "error": str(e)}
 
 
+async def get_task_status_async(*args, **kwargs) -> dict:
+    """
+    Run get_task_status in a worker thread.
+
+    Takes the same arguments as get_task_status. Lets library callers run several
+    status checks at once with asyncio.gather.
+    """
+    return await asyncio.to_thread(get_task_status, *args, **kwargs)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Check status of Kling AI video generation task",
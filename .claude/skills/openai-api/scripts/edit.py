@@ -19,11 +19,24 @@ import argparse
 import base64
 import json
 import os
+import secrets
 import sys
-import urllib.request
 import urllib.error
 from pathlib import Path
 
+import _http
+
+# Each chunk becomes one socket write when streaming images to the API
+CHUNK_SIZE = 1 << 20
+
+
+def _part_header(boundary: str, name: str, filename: str | None = None) -> bytes:
+    """Encode the boundary line and headers that precede a form part."""
+    header = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+    if filename is not None:
+        header += f'; filename="{filename}"\r\nContent-Type: image/png'
+    return f"{header}\r\n\r\n".encode()
+
 
 def create_simple_mask(width: int, height: int) -> bytes:
     """Create a simple transparent PNG mask (all editable)."""
@@ -44,12 +57,9 @@ def create_simple_mask(width: int, height: int) -> bytes:
     ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
     ihdr = png_chunk(b'IHDR', ihdr_data)
 
-    # IDAT - transparent pixels
-    raw_data = b''
-    for _ in range(height):
-        raw_data += b'\x00'  # filter byte
-        for _ in range(width):
-            raw_data += b'\x00\x00\x00\x00'  # RGBA = transparent
+    # IDAT - transparent pixels: each row is a filter byte followed by
+    # RGBA = 0 for every pixel, so the whole image is zero bytes
+    raw_data = bytes(height * (1 + width * 4))
 
     compressed = zlib.compress(raw_data)
     idat = png_chunk(b'IDAT', compressed)
@@ -75,83 +85,57 @@ def edit_image(
     if not api_key:
         return {"success": False, "error": "OPENAI_API_KEY environment variable not set"}
 
-    if not os.path.exists(image_path):
+    # One stat per file both checks that it exists and gives its size
+    try:
+        image_size = os.stat(image_path).st_size
+    except FileNotFoundError:
         return {"success": False, "error": f"Image not found: {image_path}"}
 
-    if mask_path and not os.path.exists(mask_path):
-        return {"success": False, "error": f"Mask not found: {mask_path}"}
+    if mask_path:
+        try:
+            mask_size = os.stat(mask_path).st_size
+        except FileNotFoundError:
+            return {"success": False, "error": f"Mask not found: {mask_path}"}
 
     url = "https://api.openai.com/v1/images/edits"
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    # Read image
-    with open(image_path, "rb") as f:
-        image_data = f.read()
+    # Build multipart form data. The images are streamed from disk while the
+    # request is sent; only the small text fields are encoded up front.
+    boundary = secrets.token_hex(16)
 
-    body_parts = []
+    files = [(_part_header(boundary, "image", "image.png"), image_path, image_size)]
+    if mask_path:
+        files.append((_part_header(boundary, "mask", "mask.png"), mask_path, mask_size))
+
+    fields = {
+        "prompt": prompt,
+        "model": "dall-e-2",  # DALL-E 2 for edits
+        "size": size,
+        "n": str(n),
+        "response_format": "url",
+    }
+    form = b"".join(_part_header(boundary, name) + value.encode() + b"\r\n" for name, value in fields.items())
+    form += f"--{boundary}--\r\n".encode()
 
-    # Add image
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="image"; filename="image.png"')
-    body_parts.append(b"Content-Type: image/png")
-    body_parts.append(b"")
-    body_parts.append(image_data)
+    def body():
+        for header, file_path, _ in files:
+            yield header
+            with open(file_path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+            yield b"\r\n"
+        yield form
 
-    # Add mask if provided
-    if mask_path:
-        with open(mask_path, "rb") as f:
-            mask_data = f.read()
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="mask"; filename="mask.png"')
-        body_parts.append(b"Content-Type: image/png")
-        body_parts.append(b"")
-        body_parts.append(mask_data)
-
-    # Add prompt
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="prompt"')
-    body_parts.append(b"")
-    body_parts.append(prompt.encode())
-
-    # Add model (DALL-E 2 for edits)
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="model"')
-    body_parts.append(b"")
-    body_parts.append(b"dall-e-2")
-
-    # Add size
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="size"')
-    body_parts.append(b"")
-    body_parts.append(size.encode())
-
-    # Add n
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="n"')
-    body_parts.append(b"")
-    body_parts.append(str(n).encode())
-
-    # Add response format
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="response_format"')
-    body_parts.append(b"")
-    body_parts.append(b"url")
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
-
-    body = b"\r\n".join(body_parts)
+    content_length = sum(len(header) + file_size + 2 for header, _, file_size in files) + len(form)
 
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(content_length),
     }
 
     try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
+        with _http.request("POST", url, body=body, headers=headers, timeout=120) as response:
             result = json.loads(response.read().decode("utf-8"))
 
         images = result.get("data", [])
@@ -161,7 +145,7 @@ def edit_image(
         # Download the first image
         image_url = images[0].get("url")
         if image_url:
-            urllib.request.urlretrieve(image_url, output_path)
+            _http.download(image_url, output_path)
             return {
                 "success": True,
                 "output": output_path,
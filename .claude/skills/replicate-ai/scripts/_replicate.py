@@ -0,0 +1,112 @@
+"""
+Prediction create and polling helpers shared by the Replicate scripts.
+
+Usage:
+    prediction = create_prediction(version, {"image": image_url}, api_key)
+    result = poll_prediction(prediction, api_key, timeout=600, max_delay=5.0)
+    if result["success"]:
+        _http.download(result["prediction"]["output"], output_path)
+"""
+
+import json
+import time
+import urllib.error
+
+import _http
+
+PREDICTIONS_URL = "https://api.replicate.com/v1/predictions"
+
+# Ask Replicate to hold the create request open until the prediction
+# finishes, for up to 60 seconds, so short jobs need no status polls at all.
+# CREATE_TIMEOUT leaves room for that wait.
+PREFER_WAIT = "wait=60"
+CREATE_TIMEOUT = 70
+
+# Polls start the caller's min_delay (POLL_INTERVAL_MIN by default) apart and
+# back off by 1.5x up to max_delay, dropping back to min_delay once the model
+# moves from starting to processing. Rate-limit and server errors double the
+# wait instead, up to POLL_ERROR_INTERVAL_MAX.
+POLL_INTERVAL_MIN = 1.0
+POLL_ERROR_INTERVAL_MAX = 60.0
+
+
+def create_prediction(version: str, input_data: dict, api_key: str) -> dict:
+    """
+    Start a prediction and return the prediction object.
+
+    The request is sent with PREFER_WAIT, so for short jobs the returned
+    object may already be finished. Error statuses raise
+    urllib.error.HTTPError.
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Prefer": PREFER_WAIT,
+    }
+    data = json.dumps({"version": version, "input": input_data}, separators=(",", ":")).encode()
+
+    with _http.request(
+        "POST", PREDICTIONS_URL, body=data, headers=headers, timeout=CREATE_TIMEOUT
+    ) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def poll_prediction(
+    prediction: dict,
+    api_key: str,
+    timeout: float,
+    max_delay: float = 10.0,
+    min_delay: float = POLL_INTERVAL_MIN,
+    quiet: bool = False,
+) -> dict:
+    """
+    Wait for a prediction to finish.
+
+    prediction is the object returned by the create request. If that request
+    already waited for the result (see PREFER_WAIT), no status request is
+    made. Returns {"success": True, "prediction": ...} with the final
+    prediction object once it has succeeded, or {"success": False,
+    "error": ...} if it failed or did not finish within timeout seconds.
+    Each polled status is printed unless quiet is set.
+    """
+    status_url = f"{PREDICTIONS_URL}/{prediction['id']}"
+    headers = {"Authorization": f"Bearer {api_key}"}
+    start_time = time.monotonic()
+    delay = min_delay
+    last_status = prediction.get("status")
+
+    while True:
+        status = prediction.get("status")
+
+        if status == "succeeded":
+            return {"success": True, "prediction": prediction}
+
+        elif status == "failed":
+            error = prediction.get("error", "Unknown error")
+            return {"success": False, "error": f"Processing failed: {error}"}
+
+        if time.monotonic() - start_time >= timeout:
+            return {"success": False, "error": "Timeout waiting for processing"}
+
+        time.sleep(delay)
+
+        try:
+            with _http.request("GET", status_url, headers=headers, timeout=30) as response:
+                prediction = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            # Back off through rate limiting and transient server errors
+            if e.code != 429 and e.code < 500:
+                raise
+            delay = min(delay * 2, POLL_ERROR_INTERVAL_MAX)
+            continue
+
+        status = prediction.get("status")
+        if not quiet:
+            print(f"Status: {status}")
+
+        # Poll quickly again once the model has actually started running
+        if status == "processing" and last_status == "starting":
+            delay = min_delay
+        else:
+            delay = min(delay * 1.5, max_delay)
+        last_status = status
@@ -14,32 +14,117 @@ Requirements:
 """
 
 import argparse
+import asyncio
 import base64
+import functools
 import json
 import os
+import secrets
 import sys
-import time
-import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import _http
+from _replicate import create_prediction, poll_prediction
+
+STEMS = ("vocals", "drums", "bass", "other")
+
+# Files up to this size are sent inline as data URIs; larger ones are uploaded
+# through the Files API so the prediction request only carries a URL
+DATA_URI_MAX_BYTES = 1 << 20
+
+# Read and encode files in chunks of this size. A multiple of 3 bytes, so the
+# base64 of each chunk has no padding and the pieces concatenate cleanly.
+CHUNK_SIZE = 3 << 18
+
+MIME_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+
+def get_mime_type(file_path: str) -> str:
+    """Get MIME type from file extension."""
+    return MIME_TYPES.get(Path(file_path).suffix.lower(), "audio/mpeg")
+
 
 def audio_to_data_uri(file_path: str) -> str:
-    """Convert audio file to data URI."""
-    ext = Path(file_path).suffix.lower()
-    mime_types = {
-        ".mp3": "audio/mpeg",
-        ".wav": "audio/wav",
-        ".m4a": "audio/mp4",
-        ".ogg": "audio/ogg",
-        ".flac": "audio/flac",
-    }
-    mime_type = mime_types.get(ext, "audio/mpeg")
+    """
+    Convert audio file to data URI.
+
+    The encoded result is cached by path, modification time and size, so
+    running again on an unchanged file (for example to pick another stem
+    from an importing script) skips the re-encode.
+    """
+    st = os.stat(file_path)
+    return _encode_data_uri(file_path, st.st_mtime_ns, st.st_size)
+
 
+@functools.lru_cache(maxsize=8)
+def _encode_data_uri(file_path: str, mtime_ns: int, size: int) -> str:
+    # mtime_ns and size only key the cache, so edits to the file invalidate it
+    parts = [f"data:{get_mime_type(file_path)};base64,"]
+
+    # Encode chunk by chunk so the raw file is never held in memory whole
     with open(file_path, "rb") as f:
-        data = base64.b64encode(f.read()).decode()
+        while chunk := f.read(CHUNK_SIZE):
+            parts.append(base64.b64encode(chunk).decode())
+
+    return "".join(parts)
+
+
+def upload_file(file_path: str, file_size: int, api_key: str) -> dict:
+    """Upload a file to the Replicate Files API and return its URL."""
+    boundary = secrets.token_hex(16)
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="content"; filename="{Path(file_path).name}"\r\n'
+        f"Content-Type: {get_mime_type(file_path)}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+
+    def body():
+        yield head
+        with open(file_path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+        yield tail
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(len(head) + file_size + len(tail)),
+    }
+
+    try:
+        with _http.request(
+            "POST", "https://api.replicate.com/v1/files", body=body, headers=headers, timeout=300
+        ) as response:
+            result = json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        error_body = e.read().decode("utf-8")
+        return {"success": False, "error": f"Upload failed ({e.code}): {error_body}"}
+    except Exception as e:
+        return {"success": False, "error": f"Upload failed: {e}"}
 
-    return f"data:{mime_type};base64,{data}"
+    file_url = result.get("urls", {}).get("get")
+    if not file_url:
+        return {"success": False, "error": "No file URL returned"}
+
+    return {"success": True, "url": file_url}
+
+
+def _fetch(url: str, output_path: str, skip_existing: bool = False) -> None:
+    """Download url to output_path, keeping a file already there if skip_existing is set."""
+    if skip_existing and os.path.exists(output_path):
+        print(f"Keeping existing {output_path}")
+        return
+
+    _http.download(url, output_path)
 
 
 def separate_audio(
@@ -49,49 +134,67 @@ def separate_audio(
     stem: str | None = None,
     all_stems: bool = False,
     api_key: str | None = None,
+    skip_existing: bool = False,
 ) -> dict:
-    """Separate audio using Demucs on Replicate."""
+    """
+    Separate audio using Demucs on Replicate.
+
+    With skip_existing, output files that already exist, for example from an
+    interrupted run, are kept rather than downloaded again, and no prediction
+    is made if all of them exist. Downloads only appear at their final path
+    once complete, so an existing file is never a truncated one.
+    """
 
     api_key = api_key or os.environ.get("REPLICATE_API_TOKEN")
     if not api_key:
         return {"success": False, "error": "REPLICATE_API_TOKEN environment variable not set"}
 
+    # Check before uploading or paying for a prediction
+    if skip_existing:
+        if all_stems:
+            existing = [str(Path(output_path) / f"{stem_name}.mp3") for stem_name in STEMS]
+        else:
+            existing = [output_path]
+
+        if all(os.path.exists(path) for path in existing):
+            print("All outputs already exist, skipping separation")
+            return {
+                "success": True,
+                "output": existing if all_stems else output_path,
+                "prediction_id": None,
+            }
+
     # Determine audio source
     if audio_url:
         source = audio_url
     elif audio_path:
-        if not os.path.exists(audio_path):
+        try:
+            audio_size = os.stat(audio_path).st_size
+        except FileNotFoundError:
             return {"success": False, "error": f"Audio file not found: {audio_path}"}
-        source = audio_to_data_uri(audio_path)
+
+        if audio_size <= DATA_URI_MAX_BYTES:
+            source = audio_to_data_uri(audio_path)
+        else:
+            print("Uploading audio file...")
+            upload_result = upload_file(audio_path, audio_size, api_key)
+            if not upload_result["success"]:
+                return upload_result
+            source = upload_result["url"]
     else:
         return {"success": False, "error": "Either audio file or URL required"}
 
-    url = "https://api.replicate.com/v1/predictions"
-
     # Using cjwbw/demucs model
     # https://replicate.com/cjwbw/demucs
-    payload = {
-        "version": "25a173108cff36ef9f80f854c162d01df9e6528be175794b81158fa03836d953",
-        "input": {
-            "audio": source,
-        }
-    }
+    version = "25a173108cff36ef9f80f854c162d01df9e6528be175794b81158fa03836d953"
+    model_input = {"audio": source}
 
     # If specific stem requested
     if stem and not all_stems:
-        payload["input"]["stem"] = stem
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    data = json.dumps(payload).encode()
+        model_input["stem"] = stem
 
     try:
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
+        result = create_prediction(version, model_input, api_key)
 
         prediction_id = result.get("id")
         if not prediction_id:
@@ -101,75 +204,62 @@ def separate_audio(
         print("Separating audio stems...")
 
         # Poll for completion
-        status_url = f"https://api.replicate.com/v1/predictions/{prediction_id}"
-        headers_get = {"Authorization": f"Bearer {api_key}"}
-        start_time = time.time()
-        timeout = 600  # 10 minutes
-
-        while time.time() - start_time < timeout:
-            req = urllib.request.Request(status_url, headers=headers_get, method="GET")
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status_result = json.loads(response.read().decode("utf-8"))
-
-            status = status_result.get("status")
-            print(f"Status: {status}")
-
-            if status == "succeeded":
-                output = status_result.get("output")
-
-                if isinstance(output, dict):
-                    # Multiple stems returned
-                    if all_stems:
-                        # Save all stems
-                        output_dir = Path(output_path)
-                        output_dir.mkdir(parents=True, exist_ok=True)
-
-                        saved_files = []
-                        for stem_name, stem_url in output.items():
-                            stem_path = output_dir / f"{stem_name}.mp3"
-                            urllib.request.urlretrieve(stem_url, str(stem_path))
-                            saved_files.append(str(stem_path))
-
-                        return {
-                            "success": True,
-                            "output": saved_files,
-                            "prediction_id": prediction_id,
-                        }
-                    elif stem and stem in output:
-                        urllib.request.urlretrieve(output[stem], output_path)
-                        return {
-                            "success": True,
-                            "output": output_path,
-                            "stem": stem,
-                            "prediction_id": prediction_id,
-                        }
-                    else:
-                        # Default to vocals if available
-                        stem_url = output.get("vocals") or list(output.values())[0]
-                        urllib.request.urlretrieve(stem_url, output_path)
-                        return {
-                            "success": True,
-                            "output": output_path,
-                            "prediction_id": prediction_id,
-                        }
-
-                elif isinstance(output, str):
-                    urllib.request.urlretrieve(output, output_path)
-                    return {
-                        "success": True,
-                        "output": output_path,
-                        "prediction_id": prediction_id,
-                    }
-
-                return {"success": False, "error": "Unexpected output format"}
-
-            elif status == "failed":
-                error = status_result.get("error", "Unknown error")
-                return {"success": False, "error": f"Processing failed: {error}"}
-
-            time.sleep(5)
-
-        return {"success": False, "error": "Timeout waiting for processing"}
+        poll_result = poll_prediction(result, api_key, timeout=600, max_delay=30.0, min_delay=2.0)  # 10 minutes
+        if not poll_result["success"]:
+            return poll_result
+
+        output = poll_result["prediction"].get("output")
+
+        if isinstance(output, dict):
+            # Multiple stems returned
+            if all_stems:
+                # Save all stems
+                output_dir = Path(output_path)
+                output_dir.mkdir(parents=True, exist_ok=True)
+
+                saved_files = [str(output_dir / f"{stem_name}.mp3") for stem_name in output]
+
+                # Stems are independent downloads, so fetch them concurrently
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    futures = [
+                        executor.submit(_fetch, stem_url, stem_path, skip_existing)
+                        for stem_url, stem_path in zip(output.values(), saved_files)
+                    ]
+                    for future in as_completed(futures):
+                        future.result()
+
+                return {
+                    "success": True,
+                    "output": saved_files,
+                    "prediction_id": prediction_id,
+                }
+            elif stem and stem in output:
+                _fetch(output[stem], output_path, skip_existing)
+                return {
+                    "success": True,
+                    "output": output_path,
+                    "stem": stem,
+                    "prediction_id": prediction_id,
+                }
+            else:
+                # Default to vocals if available
+                stem_url = output.get("vocals") or list(output.values())[0]
+                _fetch(stem_url, output_path, skip_existing)
+                return {
+                    "success": True,
+                    "output": output_path,
+                    "prediction_id": prediction_id,
+                }
+
+        elif isinstance(output, str):
+            _fetch(output, output_path, skip_existing)
+            return {
+                "success": True,
+                "output": output_path,
+                "prediction_id": prediction_id,
+            }
+
+        return {"success": False, "error": "Unexpected output format"}
 
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8")
@@ -178,6 +268,16 @@ def separate_audio(
         return {"success": False, "error": str(e)}
 
 
+async def separate_audio_async(*args, **kwargs) -> dict:
+    """
+    Run separate_audio in a worker thread.
+
+    Takes the same arguments as separate_audio. Lets library callers run several
+    separations at once with asyncio.gather.
+    """
+    return await asyncio.to_thread(separate_audio, *args, **kwargs)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Separate audio stems using Demucs on Replicate",
@@ -193,6 +293,9 @@ Examples:
     # Extract all stems
     %(prog)s song.mp3 -o stems_folder/ --all
 
+    # Finish an interrupted run, keeping stems that were already saved
+    %(prog)s song.mp3 -o stems_folder/ --all --skip-existing
+
     # From URL
     %(prog)s --url https://example.com/song.mp3 -o vocals.mp3 --stem vocals
 
@@ -209,7 +312,7 @@ Available stems:
     parser.add_argument("-o", "--output", required=True, help="Output file/directory path")
     parser.add_argument(
         "--stem",
-        choices=["vocals", "drums", "bass", "other"],
+        choices=STEMS,
         help="Specific stem to extract"
     )
     parser.add_argument(
@@ -217,6 +320,11 @@ Available stems:
         action="store_true",
         help="Extract all stems (output must be a directory)"
     )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="Keep output files that already exist instead of replacing them"
+    )
     parser.add_argument("-k", "--api-key", help="Replicate API token")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
@@ -232,6 +340,7 @@ Available stems:
         output_path=args.output,
         stem=args.stem,
         all_stems=args.all,
+        skip_existing=args.skip_existing,
         api_key=args.api_key,
     )
 
@@ -244,7 +353,7 @@ Available stems:
         else:
             print(f"Saved: {output}")
 
-        if args.verbose:
+        if args.verbose and result["prediction_id"]:
             print(f"Prediction ID: {result['prediction_id']}")
             if result.get("stem"):
                 print(f"Stem: {result['stem']}")
@@ -14,14 +14,14 @@ Requirements:
 """
 
 import argparse
-import json
 import os
 import sys
-import time
-import urllib.request
 import urllib.error
 from pathlib import Path
 
+import _http
+from _replicate import create_prediction, poll_prediction
+
 
 def upload_to_tmpfiles(file_path: str) -> str | None:
     """Upload file to tmpfiles.org and return URL."""
@@ -66,29 +66,16 @@ def interpolate_video_from_url(
     if not api_key:
         return {"success": False, "error": "REPLICATE_API_TOKEN environment variable not set"}
 
-    url = "https://api.replicate.com/v1/predictions"
-
     # Using zsxkib/film-frame-interpolation-for-large-motion model
     # https://replicate.com/zsxkib/film-frame-interpolation-for-large-motion
-    payload = {
-        "version": "222d67420da179935a68afff47093bab48705fe9e09c3c79268c1eb2ee7c5e91",
-        "input": {
-            "mp4": video_url,
-            "fps_multiplier": multiplier,
-        }
+    version = "222d67420da179935a68afff47093bab48705fe9e09c3c79268c1eb2ee7c5e91"
+    model_input = {
+        "mp4": video_url,
+        "fps_multiplier": multiplier,
     }
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    data = json.dumps(payload).encode()
-
     try:
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
+        result = create_prediction(version, model_input, api_key)
 
         prediction_id = result.get("id")
         if not prediction_id:
@@ -98,41 +85,23 @@ def interpolate_video_from_url(
         print("Processing video interpolation...")
 
         # Poll for completion
-        status_url = f"https://api.replicate.com/v1/predictions/{prediction_id}"
-        headers_get = {"Authorization": f"Bearer {api_key}"}
-        start_time = time.time()
-        timeout = 600  # 10 minutes
-
-        while time.time() - start_time < timeout:
-            req = urllib.request.Request(status_url, headers=headers_get, method="GET")
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status_result = json.loads(response.read().decode("utf-8"))
-
-            status = status_result.get("status")
-            print(f"Status: {status}")
-
-            if status == "succeeded":
-                output_url = status_result.get("output")
-                if output_url:
-                    # Handle both string and list output
-                    if isinstance(output_url, list):
-                        output_url = output_url[0]
-                    urllib.request.urlretrieve(output_url, output_path)
-                    return {
-                        "success": True,
-                        "output": output_path,
-                        "prediction_id": prediction_id,
-                        "multiplier": multiplier,
-                    }
-                return {"success": False, "error": "No output URL in result"}
-
-            elif status == "failed":
-                error = status_result.get("error", "Unknown error")
-                return {"success": False, "error": f"Processing failed: {error}"}
-
-            time.sleep(5)
-
-        return {"success": False, "error": "Timeout waiting for processing"}
+        poll_result = poll_prediction(result, api_key, timeout=600, max_delay=5.0)  # 10 minutes
+        if not poll_result["success"]:
+            return poll_result
+
+        output_url = poll_result["prediction"].get("output")
+        if output_url:
+            # Handle both string and list output
+            if isinstance(output_url, list):
+                output_url = output_url[0]
+            _http.download(output_url, output_path)
+            return {
+                "success": True,
+                "output": output_path,
+                "prediction_id": prediction_id,
+                "multiplier": multiplier,
+            }
+        return {"success": False, "error": "No output URL in result"}
 
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8")
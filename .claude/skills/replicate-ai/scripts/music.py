@@ -64,8 +64,8 @@ def generate_music(
     print(f"Prediction started: {prediction_id}")
 
     # Poll for completion
-    start_time = time.time()
-    while time.time() - start_time < MAX_WAIT:
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < MAX_WAIT:
         try:
             req = urllib.request.Request(f"{BASE_URL}/predictions/{prediction_id}", headers=headers)
             with urllib.request.urlopen(req, timeout=30) as response:
@@ -108,9 +108,9 @@ def wait_for_prediction(
 ) -> dict:
     """Poll until prediction completes."""
 
-    start_time = time.time()
+    start_time = time.monotonic()
 
-    while time.time() - start_time < max_wait:
+    while time.monotonic() - start_time < max_wait:
         result = get_prediction(prediction_id, api_key)
 
         if not result["success"]:
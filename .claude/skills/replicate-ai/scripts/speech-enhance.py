@@ -23,6 +23,8 @@ import urllib.request
 import urllib.error
 from pathlib import Path
 
+import _http
+
 
 def audio_to_data_uri(file_path: str) -> str:
     """Convert audio file to data URI."""
@@ -103,10 +105,10 @@ def enhance_speech(
         # Poll for completion
         status_url = f"https://api.replicate.com/v1/predictions/{prediction_id}"
         headers_get = {"Authorization": f"Bearer {api_key}"}
-        start_time = time.time()
+        start_time = time.monotonic()
         timeout = 300
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() - start_time < timeout:
             req = urllib.request.Request(status_url, headers=headers_get, method="GET")
             with urllib.request.urlopen(req, timeout=30) as response:
                 status_result = json.loads(response.read().decode("utf-8"))
@@ -118,7 +120,7 @@ def enhance_speech(
                 output = status_result.get("output")
                 if output:
                     output_url = output if isinstance(output, str) else output[0]
-                    urllib.request.urlretrieve(output_url, output_path)
+                    _http.download(output_url, output_path)
                     return {
                         "success": True,
                         "output": output_path,
@@ -6,6 +6,7 @@ Apply artistic style transfer to images using Replicate models.
 
 Usage:
     python style-transfer.py content.png style.png -o stylized.png
+    python style-transfer.py a.png b.png c.png style.png -o stylized/
     python style-transfer.py --content-url URL --style-url URL -o stylized.png
 
 Requirements:
@@ -15,30 +16,57 @@ Requirements:
 
 import argparse
 import base64
-import json
 import os
 import sys
-import time
-import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import _http
+from _replicate import create_prediction, poll_prediction
+
+# Read and encode files in chunks of this size. A multiple of 3 bytes, so the
+# base64 of each chunk has no padding and the pieces concatenate cleanly.
+CHUNK_SIZE = 3 << 18
+
+# Predictions run in parallel on Replicate's side, so a batch keeps up to
+# this many in flight at once
+MAX_WORKERS = 8
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+}
+
+
+def _sniff_mime_type(header: bytes) -> str | None:
+    """Identify an image format from its leading bytes."""
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
 
 def image_to_data_uri(file_path: str) -> str:
     """Convert image file to data URI."""
-    ext = Path(file_path).suffix.lower()
-    mime_types = {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".webp": "image/webp",
-    }
-    mime_type = mime_types.get(ext, "image/png")
-
     with open(file_path, "rb") as f:
-        data = base64.b64encode(f.read()).decode()
+        chunk = f.read(CHUNK_SIZE)
+
+        # Trust the file's content over its name; the extension is a fallback
+        mime_type = _sniff_mime_type(chunk) or MIME_TYPES.get(Path(file_path).suffix.lower(), "image/png")
+        parts = [f"data:{mime_type};base64,"]
+
+        # Encode chunk by chunk so the raw file is never held in memory whole
+        while chunk:
+            parts.append(base64.b64encode(chunk).decode())
+            chunk = f.read(CHUNK_SIZE)
 
-    return f"data:{mime_type};base64,{data}"
+    return "".join(parts)
 
 
 def style_transfer(
@@ -47,79 +75,50 @@ def style_transfer(
     output_path: str,
     style_strength: float = 0.5,
     api_key: str | None = None,
+    quiet: bool = False,
 ) -> dict:
-    """Apply style transfer using Replicate."""
+    """Apply style transfer using Replicate. quiet silences progress output."""
 
     api_key = api_key or os.environ.get("REPLICATE_API_TOKEN")
     if not api_key:
         return {"success": False, "error": "REPLICATE_API_TOKEN environment variable not set"}
 
-    url = "https://api.replicate.com/v1/predictions"
-
     # Using nkolkin13/neuralneighborstyletransfer model
     # https://replicate.com/nkolkin13/neuralneighborstyletransfer
-    payload = {
-        "version": "bdeef1dec06f904a113feb7aca86a94ba31ed3c51c2cbdcfe66725597b3dcceb",
-        "input": {
-            "content": content_url,
-            "style": style_url,
-            "output_size": 512,
-        }
-    }
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
+    version = "bdeef1dec06f904a113feb7aca86a94ba31ed3c51c2cbdcfe66725597b3dcceb"
+    model_input = {
+        "content": content_url,
+        "style": style_url,
+        "output_size": 512,
     }
 
-    data = json.dumps(payload).encode()
-
     try:
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
+        result = create_prediction(version, model_input, api_key)
 
         prediction_id = result.get("id")
         if not prediction_id:
             return {"success": False, "error": "No prediction ID returned"}
 
-        print(f"Prediction ID: {prediction_id}")
-        print("Applying style transfer...")
+        if not quiet:
+            print(f"Prediction ID: {prediction_id}")
+            print("Applying style transfer...")
 
         # Poll for completion
-        status_url = f"https://api.replicate.com/v1/predictions/{prediction_id}"
-        headers_get = {"Authorization": f"Bearer {api_key}"}
-        start_time = time.time()
-        timeout = 300  # 5 minutes
-
-        while time.time() - start_time < timeout:
-            req = urllib.request.Request(status_url, headers=headers_get, method="GET")
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status_result = json.loads(response.read().decode("utf-8"))
-
-            status = status_result.get("status")
-            print(f"Status: {status}")
-
-            if status == "succeeded":
-                output_url = status_result.get("output")
-                if output_url:
-                    if isinstance(output_url, list):
-                        output_url = output_url[0]
-                    urllib.request.urlretrieve(output_url, output_path)
-                    return {
-                        "success": True,
-                        "output": output_path,
-                        "prediction_id": prediction_id,
-                    }
-                return {"success": False, "error": "No output URL in result"}
-
-            elif status == "failed":
-                error = status_result.get("error", "Unknown error")
-                return {"success": False, "error": f"Processing failed: {error}"}
-
-            time.sleep(3)
-
-        return {"success": False, "error": "Timeout waiting for processing"}
+        poll_result = poll_prediction(result, api_key, timeout=300, max_delay=3.0, quiet=quiet)  # 5 minutes
+        if not poll_result["success"]:
+            return poll_result
+
+        output_url = poll_result["prediction"].get("output")
+        if output_url:
+            if isinstance(output_url, list):
+                output_url = output_url[0]
+            _http.download(output_url, output_path)
+            return {
+                "success": True,
+                "output": output_path,
+                "prediction_id": prediction_id,
+            }
+        return {"success": False, "error": "No output URL in result"}
 
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8")
@@ -128,6 +127,63 @@ def style_transfer(
         return {"success": False, "error": str(e)}
 
 
+def batch_output_paths(content_paths: list[str], output_dir: str) -> list[str]:
+    """
+    Name each content image's result in output_dir after the file's stem.
+
+    Inputs whose stems collide, such as a/photo.png and b/photo.jpg, get -2,
+    -3, ... appended in order, so no result overwrites another.
+    """
+    used = set()
+    output_paths = []
+    for content_path in content_paths:
+        stem = Path(content_path).stem
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem}-{n}"
+        used.add(name)
+        output_paths.append(os.path.join(output_dir, f"{name}.png"))
+    return output_paths
+
+
+def style_transfer_batch(
+    content_paths: list[str],
+    style_url: str,
+    output_dir: str,
+    style_strength: float = 0.5,
+    api_key: str | None = None,
+    max_workers: int = MAX_WORKERS,
+) -> list[dict]:
+    """
+    Apply one style to several local content images concurrently.
+
+    Each result is saved in output_dir under the content file's stem with a
+    .png suffix; colliding stems get -2, -3, ... appended. Per-image progress
+    output is silenced, since the workers would interleave it. Returns one
+    result dict per content path, in order.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_paths = batch_output_paths(content_paths, output_dir)
+
+    def run(content_path: str, output_path: str) -> dict:
+        try:
+            content_url = image_to_data_uri(content_path)
+        except FileNotFoundError:
+            return {"success": False, "error": f"Content image not found: {content_path}"}
+        return style_transfer(
+            content_url=content_url,
+            style_url=style_url,
+            output_path=output_path,
+            style_strength=style_strength,
+            api_key=api_key,
+            quiet=True,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, content_paths, output_paths))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Apply artistic style transfer using Replicate",
@@ -143,6 +199,9 @@ Examples:
     # Adjust style strength
     %(prog)s photo.png painting.jpg -o stylized.png -s 0.8
 
+    # Batch: several content images, one style, results in a directory
+    %(prog)s photos/*.png painting.jpg -o stylized/
+
 Style strength:
     - 0.0: Mostly content image
     - 0.5: Balanced (default)
@@ -150,11 +209,18 @@ Style strength:
         """
     )
 
-    parser.add_argument("content", nargs="?", help="Content image file")
-    parser.add_argument("style", nargs="?", help="Style image file")
+    parser.add_argument(
+        "images",
+        nargs="*",
+        help="Content image file(s) followed by the style image file"
+    )
     parser.add_argument("--content-url", help="Content image URL")
     parser.add_argument("--style-url", help="Style image URL")
-    parser.add_argument("-o", "--output", required=True, help="Output file path")
+    parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="Output file path (a directory when several content images are given)"
+    )
     parser.add_argument(
         "-s", "--strength",
         type=float,
@@ -166,30 +232,56 @@ Style strength:
 
     args = parser.parse_args()
 
-    # Determine content URL
-    if args.content_url:
-        content_url = args.content_url
-    elif args.content:
-        if not os.path.exists(args.content):
-            print(f"Error: Content image not found: {args.content}", file=sys.stderr)
-            sys.exit(1)
-        content_url = image_to_data_uri(args.content)
-    else:
-        print("Error: Either content file or --content-url required", file=sys.stderr)
-        sys.exit(1)
+    images = list(args.images)
 
-    # Determine style URL
+    # Determine style URL. Without --style-url the last file is the style image.
     if args.style_url:
         style_url = args.style_url
-    elif args.style:
-        if not os.path.exists(args.style):
-            print(f"Error: Style image not found: {args.style}", file=sys.stderr)
+    elif images and (args.content_url or len(images) > 1):
+        style_path = images.pop()
+        try:
+            style_url = image_to_data_uri(style_path)
+        except FileNotFoundError:
+            print(f"Error: Style image not found: {style_path}", file=sys.stderr)
             sys.exit(1)
-        style_url = image_to_data_uri(args.style)
     else:
         print("Error: Either style file or --style-url required", file=sys.stderr)
         sys.exit(1)
 
+    # Several content files: run them as a batch into the output directory
+    if not args.content_url and len(images) > 1:
+        results = style_transfer_batch(
+            content_paths=images,
+            style_url=style_url,
+            output_dir=args.output,
+            style_strength=args.strength,
+            api_key=args.api_key,
+        )
+
+        failed = 0
+        for content_path, result in zip(images, results):
+            if result["success"]:
+                print(f"Saved: {result['output']}")
+                if args.verbose:
+                    print(f"Prediction ID: {result['prediction_id']}")
+            else:
+                failed += 1
+                print(f"Error ({content_path}): {result['error']}", file=sys.stderr)
+        sys.exit(1 if failed else 0)
+
+    # Determine content URL
+    if args.content_url:
+        content_url = args.content_url
+    elif images:
+        try:
+            content_url = image_to_data_uri(images[0])
+        except FileNotFoundError:
+            print(f"Error: Content image not found: {images[0]}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        print("Error: Either content file or --content-url required", file=sys.stderr)
+        sys.exit(1)
+
     result = style_transfer(
         content_url=content_url,
         style_url=style_url,
@@ -23,6 +23,8 @@ import urllib.request
 import urllib.error
 from pathlib import Path
 
+import _http
+
 
 def track_objects(
     video_url: str,
@@ -74,10 +76,10 @@ def track_objects(
         # Poll for completion
         status_url = f"https://api.replicate.com/v1/predictions/{prediction_id}"
         headers_get = {"Authorization": f"Bearer {api_key}"}
-        start_time = time.time()
+        start_time = time.monotonic()
         timeout = 600
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() - start_time < timeout:
             req = urllib.request.Request(status_url, headers=headers_get, method="GET")
             with urllib.request.urlopen(req, timeout=30) as response:
                 status_result = json.loads(response.read().decode("utf-8"))
@@ -92,7 +94,7 @@ def track_objects(
                     # Output could be tracking data or visualized video
                     if isinstance(output, str) and output.startswith("http"):
                         # It's a video URL
-                        urllib.request.urlretrieve(output, output_path)
+                        _http.download(output, output_path)
                         return {
                             "success": True,
                             "output": output_path,
@@ -111,7 +113,7 @@ def track_objects(
                         }
                     else:
                         # Try to download as file
-                        urllib.request.urlretrieve(output, output_path)
+                        _http.download(output, output_path)
                         return {
                             "success": True,
                             "output": output_path,
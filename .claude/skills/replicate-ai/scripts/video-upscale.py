@@ -14,14 +14,14 @@ Requirements:
 """
 
 import argparse
-import json
 import os
 import sys
-import time
-import urllib.request
 import urllib.error
 from pathlib import Path
 
+import _http
+from _replicate import create_prediction, poll_prediction
+
 
 def upscale_video(
     video_url: str,
@@ -36,30 +36,17 @@ def upscale_video(
     if not api_key:
         return {"success": False, "error": "REPLICATE_API_TOKEN environment variable not set"}
 
-    url = "https://api.replicate.com/v1/predictions"
-
     # Using lucataco/real-esrgan-video model
     # https://replicate.com/lucataco/real-esrgan-video
-    payload = {
-        "version": "3e56ce4b57863bd03048b42bc09bdd4db20d427cca5fde9d8ae4dc60e1bb4775",
-        "input": {
-            "video_path": video_url,
-            "scale": scale,
-            "face_enhance": face_enhance,
-        }
+    version = "3e56ce4b57863bd03048b42bc09bdd4db20d427cca5fde9d8ae4dc60e1bb4775"
+    model_input = {
+        "video_path": video_url,
+        "scale": scale,
+        "face_enhance": face_enhance,
     }
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    data = json.dumps(payload).encode()
-
     try:
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
+        result = create_prediction(version, model_input, api_key)
 
         prediction_id = result.get("id")
         if not prediction_id:
@@ -69,40 +56,23 @@ def upscale_video(
         print("Upscaling video (this may take a while)...")
 
         # Poll for completion
-        status_url = f"https://api.replicate.com/v1/predictions/{prediction_id}"
-        headers_get = {"Authorization": f"Bearer {api_key}"}
-        start_time = time.time()
-        timeout = 1800  # 30 minutes for video processing
-
-        while time.time() - start_time < timeout:
-            req = urllib.request.Request(status_url, headers=headers_get, method="GET")
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status_result = json.loads(response.read().decode("utf-8"))
-
-            status = status_result.get("status")
-            print(f"Status: {status}")
-
-            if status == "succeeded":
-                output_url = status_result.get("output")
-                if output_url:
-                    if isinstance(output_url, list):
-                        output_url = output_url[0]
-                    urllib.request.urlretrieve(output_url, output_path)
-                    return {
-                        "success": True,
-                        "output": output_path,
-                        "prediction_id": prediction_id,
-                        "scale": scale,
-                    }
-                return {"success": False, "error": "No output URL in result"}
-
-            elif status == "failed":
-                error = status_result.get("error", "Unknown error")
-                return {"success": False, "error": f"Processing failed: {error}"}
-
-            time.sleep(10)  # Longer sleep for video processing
-
-        return {"success": False, "error": "Timeout waiting for processing"}
+        # 30 minutes, with a longer poll interval for video processing
+        poll_result = poll_prediction(result, api_key, timeout=1800, max_delay=10.0)
+        if not poll_result["success"]:
+            return poll_result
+
+        output_url = poll_result["prediction"].get("output")
+        if output_url:
+            if isinstance(output_url, list):
+                output_url = output_url[0]
+            _http.download(output_url, output_path)
+            return {
+                "success": True,
+                "output": output_path,
+                "prediction_id": prediction_id,
+                "scale": scale,
+            }
+        return {"success": False, "error": "No output URL in result"}
 
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8")
@@ -0,0 +1,44 @@
+"""
+Result download helper shared by the Runway scripts.
+
+Usage:
+    size = download(image_url, output_path, timeout=60)
+"""
+
+import http.client
+import os
+import shutil
+import urllib.request
+
+# Stream to disk in 1 MiB reads rather than shutil's 64 KiB default
+COPY_BUFSIZE = 1 << 20
+
+
+def download(url: str, output_path: str, timeout: float = 300) -> int:
+    """
+    Stream the file at url into output_path and return its size in bytes.
+
+    The file is written straight to output_path, with no temporary file or
+    rename. If the transfer fails part-way the partial file is removed, so it
+    is never mistaken for a result. Raises http.client.IncompleteRead if the
+    body ends before its declared length.
+    """
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        with open(output_path, "wb") as f:
+            try:
+                shutil.copyfileobj(response, f, COPY_BUFSIZE)
+                size = f.tell()
+
+                # read(n) reports a body cut short only by returning less
+                # data, so check that all of it arrived
+                if response.length:
+                    raise http.client.IncompleteRead(b"", response.length)
+            except BaseException:
+                f.close()
+                try:
+                    os.unlink(output_path)
+                except OSError:
+                    pass
+                raise
+
+    return size
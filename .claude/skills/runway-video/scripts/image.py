@@ -17,15 +17,10 @@ Requires: pip install runwayml
 import argparse
 import base64
 import os
+import re
 import sys
-import urllib.request
-
-try:
-    from runwayml import RunwayML
-except ImportError:
-    print("Error: runwayml package not installed. Run: pip install runwayml", file=sys.stderr)
-    sys.exit(1)
 
+from _download import download
 
 MODELS = {
     "gemini": "gemini_2.5_flash",         # 5 credits, no reference needed
@@ -52,6 +47,19 @@ GEN4_RATIOS = {
     "square": "1024:1024",
 }
 
+# Besides the named ratios above, an explicit API ratio is passed through as is
+API_RATIO = re.compile(r"\d+:\d+")
+
+# Models that can only generate from a reference image
+NEEDS_REFERENCE = frozenset({"gen4_image", "gen4_image_turbo"})
+
+# Reference image MIME types by file extension
+MIME_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}
+
+# Read and encode reference images in chunks of this size. A multiple of 3
+# bytes, so the base64 of each chunk has no padding.
+CHUNK_SIZE = 3 << 18
+
 
 def generate_image(
     prompt: str,
@@ -68,19 +76,35 @@ def generate_image(
         return {"success": False, "error": "RUNWAY_API_SECRET not set"}
 
     # Resolve model alias
-    if model in MODELS:
-        model = MODELS[model]
+    model = MODELS.get(model, model)
 
     # Check if reference image is required
-    needs_reference = model in ["gen4_image", "gen4_image_turbo"]
+    needs_reference = model in NEEDS_REFERENCE
     if needs_reference and not reference_image:
         return {"success": False, "error": f"{model} requires a reference image. Use -i option or use 'gemini' model for text-only."}
 
     # Resolve ratio based on model
-    if model == "gemini_2.5_flash":
-        api_ratio = GEMINI_RATIOS.get(ratio, ratio)
+    ratios, other_ratios = (
+        (GEMINI_RATIOS, GEN4_RATIOS) if model == "gemini_2.5_flash" else (GEN4_RATIOS, GEMINI_RATIOS)
+    )
+    if ratio in ratios:
+        api_ratio = ratios[ratio]
+    elif ratio not in other_ratios and API_RATIO.fullmatch(ratio):
+        api_ratio = ratio
     else:
-        api_ratio = GEN4_RATIOS.get(ratio, ratio)
+        # Unknown, or named only for the other model family
+        return {"success": False, "error": f"Ratio {ratio} is not available for {model}. Use one of {', '.join(ratios)} or an explicit W:H ratio."}
+
+    is_local_reference = reference_image and not reference_image.startswith(("http://", "https://"))
+    if is_local_reference and not os.path.exists(reference_image):
+        return {"success": False, "error": f"Reference image not found: {reference_image}"}
+
+    # Imported only once the arguments are known to be valid, since the SDK
+    # is slow to import
+    try:
+        from runwayml import RunwayML
+    except ImportError:
+        return {"success": False, "error": "runwayml package not installed. Run: pip install runwayml"}
 
     # Initialize client
     client = RunwayML(api_key=api_key)
@@ -93,16 +117,18 @@ def generate_image(
         # Prepare reference images if needed
         ref_images = []
         if reference_image:
-            if reference_image.startswith(("http://", "https://")):
+            if not is_local_reference:
                 ref_images = [{"uri": reference_image}]
             else:
-                # Local file - convert to base64
-                with open(reference_image, "rb") as f:
-                    image_data = base64.b64encode(f.read()).decode("utf-8")
+                # Local file - convert to base64, chunk by chunk so the raw
+                # file is never held in memory whole
                 ext = reference_image.lower().split(".")[-1]
-                mime_types = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}
-                mime_type = mime_types.get(ext, "image/png")
-                ref_images = [{"uri": f"data:{mime_type};base64,{image_data}"}]
+                mime_type = MIME_TYPES.get(ext, "image/png")
+                parts = [f"data:{mime_type};base64,"]
+                with open(reference_image, "rb") as f:
+                    while chunk := f.read(CHUNK_SIZE):
+                        parts.append(base64.b64encode(chunk).decode("utf-8"))
+                ref_images = [{"uri": "".join(parts)}]
 
         # Create task
         if needs_reference:
@@ -127,17 +153,12 @@ def generate_image(
 
             # Download image
             print(f"Downloading image...")
-            req = urllib.request.Request(image_url)
-            with urllib.request.urlopen(req, timeout=60) as response:
-                image_data = response.read()
-
-            with open(output_path, "wb") as f:
-                f.write(image_data)
+            size_bytes = download(image_url, output_path, timeout=60)
 
             return {
                 "success": True,
                 "output_path": output_path,
-                "size_bytes": len(image_data),
+                "size_bytes": size_bytes,
                 "task_id": task.id,
             }
         else:
@@ -147,6 +168,13 @@ def generate_image(
         return {"success": False, "error": str(e)}
 
 
+def ratio_arg(value: str) -> str:
+    """argparse type for --ratio: a named ratio or an explicit W:H API ratio."""
+    if value in GEMINI_RATIOS or value in GEN4_RATIOS or API_RATIO.fullmatch(value):
+        return value
+    raise argparse.ArgumentTypeError(f"expected a named ratio or W:H, got {value!r}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Runway Image Generation")
     parser.add_argument("prompt", help="Text description of the image")
@@ -155,7 +183,8 @@ def main():
                         choices=list(MODELS.keys()),
                         help="Model: gemini (text-only), gen4_image/turbo (needs reference)")
     parser.add_argument("-r", "--ratio", default="16:9",
-                        help="Aspect ratio (16:9, 9:16, 1:1, 4:3, 720p, 1080p)")
+                        type=ratio_arg, metavar="RATIO",
+                        help="Aspect ratio (16:9, 9:16, 1:1, 4:3, 720p, 1080p) or an explicit W:H such as 1360:768")
     parser.add_argument("-i", "--reference", help="Reference image (required for gen4 models)")
     parser.add_argument("-k", "--api-key", help="API key (or set RUNWAY_API_SECRET)")
 
@@ -23,6 +23,8 @@ import urllib.request
 import urllib.error
 from pathlib import Path
 
+from _download import download
+
 
 def encode_image(image_path: str) -> str:
     """Encode image to base64 data URI."""
@@ -116,7 +118,7 @@ def inpaint_video(
                 output_urls = status_result.get("output", [])
                 if output_urls:
                     video_url = output_urls[0] if isinstance(output_urls, list) else output_urls
-                    urllib.request.urlretrieve(video_url, output_path)
+                    download(video_url, output_path, timeout=300)
                     return {
                         "success": True,
                         "output": output_path,
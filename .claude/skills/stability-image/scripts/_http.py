@@ -0,0 +1,135 @@
+"""
+Persistent HTTPS connections for the Stability AI scripts.
+
+Requests to the same host share one keep-alive connection, so when several
+operations run in one process (for example remove-bg, then upscale, then
+outpaint from a Python script) only the first pays for the TCP and TLS
+handshake. Each thread gets its own connections, so jobs may run
+concurrently in separate threads.
+
+Usage:
+    with request("POST", url, body=body, headers=headers, timeout=120) as response:
+        size = save_response(response, output_path)
+"""
+
+import atexit
+import http.client
+import io
+import os
+import shutil
+import ssl
+import threading
+import urllib.error
+from collections.abc import Mapping
+from urllib.parse import urlsplit
+
+# Copy responses to disk in 1 MiB reads rather than shutil's 64 KiB default
+COPY_BUFSIZE = 1 << 20
+
+# Loading the CA store takes tens of milliseconds, so every connection shares
+# one context instead of http.client building a new one per connection
+_SSL_CONTEXT = ssl.create_default_context()
+
+# (thread id, host) -> connection
+_connections: dict[tuple[int, str], http.client.HTTPSConnection] = {}
+
+
+def _close_connections() -> None:
+    for conn in _connections.values():
+        conn.close()
+
+
+atexit.register(_close_connections)
+
+
+def request(
+    method: str,
+    url: str,
+    body=None,
+    headers: Mapping[str, str] | None = None,
+    timeout: float = 60,
+) -> http.client.HTTPResponse:
+    """
+    Send a request over a keep-alive connection cached per thread and host.
+
+    body may be bytes or a zero-argument callable returning an iterable of
+    bytes, so a streamed body can be regenerated if the request is retried;
+    streamed bodies need an explicit Content-Length header. Error statuses
+    raise urllib.error.HTTPError, as urllib.request.urlopen does, with the
+    body already read so the connection stays usable. A reused connection
+    that the server has since closed is re-opened once. The response must be
+    read fully before the next request to the same host.
+    """
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    key = (threading.get_ident(), parts.netloc)
+
+    while True:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout, context=_SSL_CONTEXT)
+            _connections[key] = conn
+        reused = conn.sock is not None
+
+        conn.timeout = timeout
+        if reused:
+            conn.sock.settimeout(timeout)
+
+        try:
+            conn.request(
+                method,
+                path,
+                body=body() if callable(body) else body,
+                headers=headers or {},
+            )
+            response = conn.getresponse()
+            break
+        except ConnectionError:
+            conn.close()
+            del _connections[key]
+            if not reused:
+                raise
+
+    if response.status >= 400:
+        error_body = response.read()
+        raise urllib.error.HTTPError(
+            url, response.status, response.reason, response.headers, io.BytesIO(error_body)
+        )
+
+    return response
+
+
+def save_response(response: http.client.HTTPResponse, output_path: str) -> int:
+    """
+    Stream response's body into output_path and return its size in bytes.
+
+    The body is written straight to output_path, with no temporary file or
+    rename. If the transfer fails part-way the partial file is removed, so it
+    is never mistaken for a result. Raises http.client.IncompleteRead if the
+    body ends before its declared length.
+    """
+    with open(output_path, "wb") as f:
+        try:
+            shutil.copyfileobj(response, f, COPY_BUFSIZE)
+            size = f.tell()
+
+            # read(n) reports a body cut short only by returning less data,
+            # so check that all of it arrived
+            if response.length:
+                raise http.client.IncompleteRead(b"", response.length)
+        except BaseException:
+            f.close()
+            try:
+                os.unlink(output_path)
+            except OSError:
+                pass
+            raise
+
+    return size
+
+
+def discard(url: str) -> None:
+    """Close this thread's connection to url's host, e.g. after a failed transfer."""
+    conn = _connections.pop((threading.get_ident(), urlsplit(url).netloc), None)
+    if conn is not None:
+        conn.close()
@@ -0,0 +1,87 @@
+"""
+Streaming multipart/form-data encoder for the Stability AI scripts.
+
+The input image is read from disk in fixed-size chunks while the request is
+being sent, so memory use stays constant regardless of image size. An image
+already in memory (for example a recompressed PNG) is sent as is.
+
+Usage:
+    body, length = multipart_body({"output_format": "png"}, image_path, image_size)
+    headers = {"Content-Type": CONTENT_TYPE, "Content-Length": str(length)}
+    _http.request("POST", url, body=body, headers=headers)
+
+    # Text fields only
+    data = multipart_form({"prompt": prompt})
+"""
+
+# Each chunk becomes one socket write, so keep it large enough to amortize
+# syscall overhead on fast links
+CHUNK_SIZE = 1 << 20
+
+_CRLF = b"\r\n"
+
+# Every Stability form uses this boundary, so the delimiter lines and the
+# image part header are encoded once at import rather than on every request
+BOUNDARY = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+_BOUNDARY_LINE = b"--" + BOUNDARY.encode()
+_CLOSING = _BOUNDARY_LINE + b"--" + _CRLF
+
+
+def _part_header(
+    name: str,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> bytes:
+    """Encode the boundary line and headers that precede a part's content."""
+    disposition = f'Content-Disposition: form-data; name="{name}"'
+    if filename is not None:
+        disposition += f'; filename="{filename}"'
+
+    lines = [_BOUNDARY_LINE, disposition.encode()]
+    if content_type is not None:
+        lines.append(f"Content-Type: {content_type}".encode())
+    lines.append(_CRLF)
+
+    return _CRLF.join(lines)
+
+
+_IMAGE_HEADER = _part_header("image", "image.png", "image/png")
+
+
+def _encode_fields(fields: dict[str, str]) -> bytes:
+    """Encode text fields as consecutive form parts in a single join."""
+    return b"".join(_part_header(name) + value.encode() + _CRLF for name, value in fields.items())
+
+
+def multipart_form(fields: dict[str, str]) -> bytes:
+    """Encode a complete multipart/form-data body of text fields only."""
+    return _encode_fields(fields) + _CLOSING
+
+
+def multipart_body(fields: dict[str, str], image: str | bytes, image_size: int):
+    """
+    Build a multipart/form-data body of text fields plus one image.
+
+    image is a file path or the image's bytes. Returns (body, length). body is
+    a function yielding the encoded body piece by piece, with an image file
+    sent as the "image" part in CHUNK_SIZE blocks. length is the exact body
+    size for the Content-Length header, so the request is not sent with
+    chunked transfer encoding.
+    """
+    form = _encode_fields(fields)
+
+    def body():
+        yield form
+        yield _IMAGE_HEADER
+        if isinstance(image, bytes):
+            yield image
+        else:
+            with open(image, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+        yield _CRLF
+        yield _CLOSING
+
+    return body, len(form) + len(_IMAGE_HEADER) + image_size + len(_CRLF) + len(_CLOSING)
@@ -0,0 +1,115 @@
+"""
+Request helper shared by the Stability AI image-editing scripts.
+
+Each of those endpoints takes one input image plus a few text fields and
+returns the edited image, so upload, download and error handling live here,
+along with the helpers for their batch modes.
+
+Usage:
+    result = post_image(url, {"output_format": "png"}, image_path, output_path, api_key)
+    if result["success"]:
+        print(f"Saved: {result['output']}")
+
+    output_paths = batch_output_paths(image_paths, output_dir, "png")
+"""
+
+import argparse
+import json
+import os
+import urllib.error
+from pathlib import Path
+
+import _http
+import _png
+from _multipart import CONTENT_TYPE, multipart_body
+
+
+def post_image(
+    url: str,
+    fields: dict[str, str],
+    image_path: str,
+    output_path: str,
+    api_key: str,
+    timeout: float = 120,
+    optimize: bool = False,
+) -> dict:
+    """
+    Send image_path with fields to a Stability endpoint and save the result.
+
+    The image is streamed from disk and the returned image is streamed to
+    output_path. With optimize, a PNG image is first recompressed losslessly
+    and sent in its smaller form; recompressing loads the whole file and its
+    decompressed pixels into memory, so that upload is not streamed.
+
+    Returns {"success": True, "output": output_path}, or {"success": False,
+    "error": ...} with the API's message on failure.
+    """
+    # One stat both checks that the image exists and gives its size
+    try:
+        image_size = os.stat(image_path).st_size
+    except FileNotFoundError:
+        return {"success": False, "error": f"Image not found: {image_path}"}
+
+    image = image_path
+    if optimize:
+        try:
+            recompressed = _png.recompress(image_path)
+        except OSError as e:
+            return {"success": False, "error": str(e)}
+        if recompressed is not None:
+            image, image_size = recompressed, len(recompressed)
+
+    body, content_length = multipart_body(fields, image, image_size)
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Accept": "image/*",
+        "Content-Type": CONTENT_TYPE,
+        "Content-Length": str(content_length),
+    }
+
+    try:
+        with _http.request("POST", url, body=body, headers=headers, timeout=timeout) as response:
+            _http.save_response(response, output_path)
+    except urllib.error.HTTPError as e:
+        error_body = e.read().decode("utf-8")
+        try:
+            error_json = json.loads(error_body)
+            error_msg = error_json.get("message", error_body)
+        except json.JSONDecodeError:
+            error_msg = error_body
+        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
+    except Exception as e:
+        # The connection may be left mid-response, so do not reuse it
+        _http.discard(url)
+        return {"success": False, "error": str(e)}
+
+    return {"success": True, "output": output_path}
+
+
+def batch_output_paths(image_paths: list[str], output_dir: str, suffix: str) -> list[str]:
+    """
+    Name each image's result in output_dir after the input file's stem.
+
+    Inputs whose stems collide, such as a/photo.png and b/photo.jpg, get -2,
+    -3, ... appended in order, so no result overwrites another.
+    """
+    used = set()
+    output_paths = []
+    for image_path in image_paths:
+        stem = Path(image_path).stem
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem}-{n}"
+        used.add(name)
+        output_paths.append(os.path.join(output_dir, f"{name}.{suffix}"))
+    return output_paths
+
+
+def positive_int(value: str) -> int:
+    """argparse type for --jobs: an integer of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
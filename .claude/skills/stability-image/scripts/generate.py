@@ -10,9 +10,13 @@ Usage:
 import argparse
 import os
 import sys
-import urllib.request
 import urllib.error
 
+import _http
+from _multipart import CONTENT_TYPE, multipart_form
+
+GENERATE_URL = "https://api.stability.ai/v2beta/stable-image/generate"
+
 MODELS = {
     "sd35-large": ("sd3", "sd3.5-large"),
     "sd35-turbo": ("sd3", "sd3.5-large-turbo"),
@@ -56,63 +60,50 @@ def generate_image(
     if model in MODELS:
         endpoint, model_param = MODELS[model]
 
-    url = f"https://api.stability.ai/v2beta/stable-image/generate/{endpoint}"
+    url = f"{GENERATE_URL}/{endpoint}"
 
     # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-    body_parts = []
-
-    def add_field(name: str, value: str):
-        body_parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n')
-
-    add_field("prompt", prompt)
-    add_field("output_format", output_format)
+    fields = {"prompt": prompt, "output_format": output_format}
 
     if model_param:
-        add_field("model", model_param)
+        fields["model"] = model_param
 
     if aspect_ratio in ASPECT_RATIOS:
-        add_field("aspect_ratio", aspect_ratio)
+        fields["aspect_ratio"] = aspect_ratio
 
     if negative_prompt:
-        add_field("negative_prompt", negative_prompt)
+        fields["negative_prompt"] = negative_prompt
 
     if style_preset and style_preset in STYLE_PRESETS:
-        add_field("style_preset", style_preset)
+        fields["style_preset"] = style_preset
 
     if seed is not None:
-        add_field("seed", str(seed))
+        fields["seed"] = str(seed)
 
-    body_parts.append(f'--{boundary}--\r\n')
-    body = "".join(body_parts).encode("utf-8")
+    body = multipart_form(fields)
 
     headers = {
         "Authorization": f"Bearer {api_key}",
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Type": CONTENT_TYPE,
         "Accept": "image/*",
         "User-Agent": "VibeFrame/1.0",
     }
 
     try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            image_data = response.read()
+        with _http.request("POST", url, body=body, headers=headers, timeout=120) as response:
+            size_bytes = _http.save_response(response, output_path)
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8")
         return {"success": False, "error": f"API error ({e.code}): {error_body}"}
     except Exception as e:
+        # The connection may be left mid-response, so do not reuse it
+        _http.discard(url)
         return {"success": False, "error": str(e)}
 
-    try:
-        with open(output_path, "wb") as f:
-            f.write(image_data)
-    except Exception as e:
-        return {"success": False, "error": f"Failed to save: {e}"}
-
     return {
         "success": True,
         "output_path": output_path,
-        "size_bytes": len(image_data),
+        "size_bytes": size_bytes,
     }
 
 
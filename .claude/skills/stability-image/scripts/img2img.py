@@ -14,12 +14,10 @@ Requirements:
 """
 
 import argparse
-import json
 import os
 import sys
-import urllib.request
-import urllib.error
-from pathlib import Path
+
+from _stability import post_image
 
 
 def image_to_image(
@@ -31,6 +29,7 @@ def image_to_image(
     seed: int | None = None,
     output_format: str = "png",
     api_key: str | None = None,
+    optimize: bool = False,
 ) -> dict:
     """Transform an image using Stability AI SD3."""
 
@@ -38,99 +37,29 @@ def image_to_image(
     if not api_key:
         return {"success": False, "error": "STABILITY_API_KEY environment variable not set"}
 
-    if not os.path.exists(image_path):
-        return {"success": False, "error": f"Image not found: {image_path}"}
-
     # SD3 endpoint supports image-to-image with mode parameter
     url = "https://api.stability.ai/v2beta/stable-image/generate/sd3"
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    with open(image_path, "rb") as f:
-        image_data = f.read()
-
-    # Build form data
-    body_parts = []
-
-    # Add image file
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="image"; filename="image.png"')
-    body_parts.append(b"Content-Type: image/png")
-    body_parts.append(b"")
-    body_parts.append(image_data)
-
-    # Add mode
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="mode"')
-    body_parts.append(b"")
-    body_parts.append(b"image-to-image")
-
-    # Add prompt
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="prompt"')
-    body_parts.append(b"")
-    body_parts.append(prompt.encode())
-
-    # Add strength
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="strength"')
-    body_parts.append(b"")
-    body_parts.append(str(strength).encode())
-
-    # Add output format
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="output_format"')
-    body_parts.append(b"")
-    body_parts.append(output_format.encode())
+    # Form fields sent alongside the image
+    fields = {
+        "mode": "image-to-image",
+        "prompt": prompt,
+        "strength": str(strength),
+        "output_format": output_format,
+    }
 
     # Add optional negative prompt
     if negative_prompt:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="negative_prompt"')
-        body_parts.append(b"")
-        body_parts.append(negative_prompt.encode())
+        fields["negative_prompt"] = negative_prompt
 
     # Add optional seed
     if seed is not None:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="seed"')
-        body_parts.append(b"")
-        body_parts.append(str(seed).encode())
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
-
-    body = b"\r\n".join(body_parts)
+        fields["seed"] = str(seed)
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Accept": "image/*",
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-    }
-
-    try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            # Save the image
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-
-            return {
-                "success": True,
-                "output": output_path,
-                "strength": strength,
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("message", error_body)
-        except json.JSONDecodeError:
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    result = post_image(url, fields, image_path, output_path, api_key, timeout=120, optimize=optimize)
+    if result["success"]:
+        result["strength"] = strength
+    return result
 
 
 def main():
@@ -168,6 +97,11 @@ Examples:
         help="Output format (default: png)"
     )
     parser.add_argument("-k", "--api-key", help="Stability API key")
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Recompress PNG input losslessly before upload (helps on slow uplinks)"
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
     args = parser.parse_args()
@@ -183,6 +117,7 @@ Examples:
         seed=args.seed,
         output_format=args.format,
         api_key=args.api_key,
+        optimize=args.optimize,
     )
 
     if result["success"]:
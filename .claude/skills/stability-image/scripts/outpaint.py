@@ -14,12 +14,10 @@ Requirements:
 """
 
 import argparse
-import json
 import os
 import sys
-import urllib.request
-import urllib.error
-from pathlib import Path
+
+from _stability import post_image
 
 
 def outpaint(
@@ -33,6 +31,7 @@ def outpaint(
     creativity: float = 0.5,
     output_format: str = "png",
     api_key: str | None = None,
+    optimize: bool = False,
 ) -> dict:
     """Extend image boundaries using Stability AI outpaint."""
 
@@ -40,112 +39,26 @@ def outpaint(
     if not api_key:
         return {"success": False, "error": "STABILITY_API_KEY environment variable not set"}
 
-    if not os.path.exists(image_path):
-        return {"success": False, "error": f"Image not found: {image_path}"}
-
-    if left == 0 and right == 0 and up == 0 and down == 0:
+    extensions = {"left": left, "right": right, "up": up, "down": down}
+    if all(pixels == 0 for pixels in extensions.values()):
         return {"success": False, "error": "At least one direction must be specified (--left, --right, --up, --down)"}
 
     url = "https://api.stability.ai/v2beta/stable-image/edit/outpaint"
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    with open(image_path, "rb") as f:
-        image_data = f.read()
-
-    # Build form data
-    body_parts = []
-
-    # Add image file
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="image"; filename="image.png"')
-    body_parts.append(b"Content-Type: image/png")
-    body_parts.append(b"")
-    body_parts.append(image_data)
-
-    # Add direction values
-    if left > 0:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="left"')
-        body_parts.append(b"")
-        body_parts.append(str(left).encode())
-
-    if right > 0:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="right"')
-        body_parts.append(b"")
-        body_parts.append(str(right).encode())
-
-    if up > 0:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="up"')
-        body_parts.append(b"")
-        body_parts.append(str(up).encode())
-
-    if down > 0:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="down"')
-        body_parts.append(b"")
-        body_parts.append(str(down).encode())
+    # Form fields sent alongside the image, starting with the directions to extend
+    fields = {direction: str(pixels) for direction, pixels in extensions.items() if pixels > 0}
 
     # Add prompt if provided
     if prompt:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="prompt"')
-        body_parts.append(b"")
-        body_parts.append(prompt.encode())
-
-    # Add creativity
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="creativity"')
-    body_parts.append(b"")
-    body_parts.append(str(creativity).encode())
-
-    # Add output format
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="output_format"')
-    body_parts.append(b"")
-    body_parts.append(output_format.encode())
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
-
-    body = b"\r\n".join(body_parts)
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Accept": "image/*",
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-    }
-
-    try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            # Save the image
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-
-            return {
-                "success": True,
-                "output": output_path,
-                "extensions": {
-                    "left": left,
-                    "right": right,
-                    "up": up,
-                    "down": down,
-                },
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("message", error_body)
-        except json.JSONDecodeError:
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+        fields["prompt"] = prompt
+
+    fields["creativity"] = str(creativity)
+    fields["output_format"] = output_format
+
+    result = post_image(url, fields, image_path, output_path, api_key, timeout=120, optimize=optimize)
+    if result["success"]:
+        result["extensions"] = extensions
+    return result
 
 
 def main():
@@ -188,6 +101,11 @@ Examples:
         help="Output format (default: png)"
     )
     parser.add_argument("-k", "--api-key", help="Stability API key")
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Recompress PNG input losslessly before upload (helps on slow uplinks)"
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
     args = parser.parse_args()
@@ -205,6 +123,7 @@ Examples:
         creativity=args.creativity,
         output_format=args.format,
         api_key=args.api_key,
+        optimize=args.optimize,
     )
 
     if result["success"]:
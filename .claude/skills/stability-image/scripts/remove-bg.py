@@ -7,6 +7,7 @@ Remove backgrounds from images using Stability AI.
 Usage:
     python remove-bg.py input.png -o output.png
     python remove-bg.py photo.jpg -o transparent.png
+    python remove-bg.py photos/*.png -o transparent/ -j 8
 
 Requirements:
     - STABILITY_API_KEY environment variable
@@ -14,19 +15,23 @@ Requirements:
 """
 
 import argparse
-import json
 import os
 import sys
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from _stability import batch_output_paths, positive_int, post_image
+
+# Default number of images sent to the API at once in batch mode
+MAX_WORKERS = 4
+
 
 def remove_background(
     image_path: str,
     output_path: str,
     output_format: str = "png",
     api_key: str | None = None,
+    optimize: bool = False,
 ) -> dict:
     """Remove background from an image using Stability AI."""
 
@@ -34,65 +39,43 @@ def remove_background(
     if not api_key:
         return {"success": False, "error": "STABILITY_API_KEY environment variable not set"}
 
-    if not os.path.exists(image_path):
-        return {"success": False, "error": f"Image not found: {image_path}"}
-
     url = "https://api.stability.ai/v2beta/stable-image/edit/remove-background"
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    with open(image_path, "rb") as f:
-        image_data = f.read()
-
-    # Build form data
-    body_parts = []
-
-    # Add image file
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="image"; filename="image.png"')
-    body_parts.append(b"Content-Type: image/png")
-    body_parts.append(b"")
-    body_parts.append(image_data)
-
-    # Add output format
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="output_format"')
-    body_parts.append(b"")
-    body_parts.append(output_format.encode())
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
-
-    body = b"\r\n".join(body_parts)
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Accept": "image/*",
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-    }
-
-    try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=60) as response:
-            # Save the image
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-
-            return {
-                "success": True,
-                "output": output_path,
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("message", error_body)
-        except json.JSONDecodeError:
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    # Form fields sent alongside the image
+    fields = {"output_format": output_format}
+
+    return post_image(url, fields, image_path, output_path, api_key, timeout=60, optimize=optimize)
+
+
+def remove_background_batch(
+    image_paths: list[str],
+    output_dir: str,
+    output_format: str = "png",
+    api_key: str | None = None,
+    optimize: bool = False,
+    max_workers: int = MAX_WORKERS,
+) -> list[dict]:
+    """
+    Remove the background from several images concurrently.
+
+    Each result is saved in output_dir under the input file's stem, with the
+    output format as suffix; colliding stems get -2, -3, ... appended.
+    Returns one result dict per image, in order.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_paths = batch_output_paths(image_paths, output_dir, output_format)
+
+    def run(image_path: str, output_path: str) -> dict:
+        return remove_background(
+            image_path=image_path,
+            output_path=output_path,
+            output_format=output_format,
+            api_key=api_key,
+            optimize=optimize,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, image_paths, output_paths))
 
 
 def main():
@@ -106,11 +89,24 @@ Examples:
 
     # Save as WebP
     %(prog)s photo.jpg -o output.webp -f webp
+
+    # Batch: every PNG in a folder, 8 at a time
+    %(prog)s photos/*.png -o transparent/ -j 8
         """
     )
 
-    parser.add_argument("image", help="Input image path")
-    parser.add_argument("-o", "--output", required=True, help="Output file path")
+    parser.add_argument("image", nargs="+", help="Input image path(s)")
+    parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="Output file path (a directory when several images are given)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=positive_int,
+        default=MAX_WORKERS,
+        help=f"Images processed at once when several are given (default: {MAX_WORKERS})"
+    )
     parser.add_argument(
         "-f", "--format",
         choices=["png", "webp"],
@@ -118,16 +114,43 @@ Examples:
         help="Output format (default: png)"
     )
     parser.add_argument("-k", "--api-key", help="Stability API key")
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Recompress PNG input losslessly before upload (helps on slow uplinks)"
+    )
 
     args = parser.parse_args()
 
+    if len(args.image) > 1:
+        print(f"Removing background from {len(args.image)} images...")
+
+        results = remove_background_batch(
+            image_paths=args.image,
+            output_dir=args.output,
+            output_format=args.format,
+            api_key=args.api_key,
+            optimize=args.optimize,
+            max_workers=args.jobs,
+        )
+
+        failed = 0
+        for image_path, result in zip(args.image, results):
+            if result["success"]:
+                print(f"Saved: {result['output']}")
+            else:
+                failed += 1
+                print(f"Error ({image_path}): {result['error']}", file=sys.stderr)
+        sys.exit(1 if failed else 0)
+
     print("Removing background...")
 
     result = remove_background(
-        image_path=args.image,
+        image_path=args.image[0],
         output_path=args.output,
         output_format=args.format,
         api_key=args.api_key,
+        optimize=args.optimize,
     )
 
     if result["success"]:
@@ -14,12 +14,10 @@ Requirements:
 """
 
 import argparse
-import json
 import os
 import sys
-import urllib.request
-import urllib.error
-from pathlib import Path
+
+from _stability import post_image
 
 
 def search_and_replace(
@@ -31,6 +29,7 @@ def search_and_replace(
     seed: int | None = None,
     output_format: str = "png",
     api_key: str | None = None,
+    optimize: bool = False,
 ) -> dict:
     """Search and replace objects in an image using Stability AI."""
 
@@ -38,93 +37,28 @@ def search_and_replace(
     if not api_key:
         return {"success": False, "error": "STABILITY_API_KEY environment variable not set"}
 
-    if not os.path.exists(image_path):
-        return {"success": False, "error": f"Image not found: {image_path}"}
-
     url = "https://api.stability.ai/v2beta/stable-image/edit/search-and-replace"
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    with open(image_path, "rb") as f:
-        image_data = f.read()
-
-    # Build form data
-    body_parts = []
-
-    # Add image file
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="image"; filename="image.png"')
-    body_parts.append(b"Content-Type: image/png")
-    body_parts.append(b"")
-    body_parts.append(image_data)
-
-    # Add prompt (what to replace with)
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="prompt"')
-    body_parts.append(b"")
-    body_parts.append(prompt.encode())
-
-    # Add search prompt (what to find)
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="search_prompt"')
-    body_parts.append(b"")
-    body_parts.append(search_prompt.encode())
-
-    # Add output format
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="output_format"')
-    body_parts.append(b"")
-    body_parts.append(output_format.encode())
+    # Form fields sent alongside the image
+    fields = {
+        "prompt": prompt,  # what to replace with
+        "search_prompt": search_prompt,  # what to find
+        "output_format": output_format,
+    }
 
     # Add optional negative prompt
     if negative_prompt:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="negative_prompt"')
-        body_parts.append(b"")
-        body_parts.append(negative_prompt.encode())
+        fields["negative_prompt"] = negative_prompt
 
     # Add optional seed
     if seed is not None:
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="seed"')
-        body_parts.append(b"")
-        body_parts.append(str(seed).encode())
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
-
-    body = b"\r\n".join(body_parts)
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Accept": "image/*",
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-    }
+        fields["seed"] = str(seed)
 
-    try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            # Save the image
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-
-            return {
-                "success": True,
-                "output": output_path,
-                "search": search_prompt,
-                "replace": prompt,
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("message", error_body)
-        except json.JSONDecodeError:
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    result = post_image(url, fields, image_path, output_path, api_key, timeout=120, optimize=optimize)
+    if result["success"]:
+        result["search"] = search_prompt
+        result["replace"] = prompt
+    return result
 
 
 def main():
@@ -157,6 +91,11 @@ Examples:
         help="Output format (default: png)"
     )
     parser.add_argument("-k", "--api-key", help="Stability API key")
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Recompress PNG input losslessly before upload (helps on slow uplinks)"
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
     args = parser.parse_args()
@@ -172,6 +111,7 @@ Examples:
         seed=args.seed,
         output_format=args.format,
         api_key=args.api_key,
+        optimize=args.optimize,
     )
 
     if result["success"]:
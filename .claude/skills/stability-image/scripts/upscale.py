@@ -8,6 +8,7 @@ Usage:
     python upscale.py input.png -o upscaled.png
     python upscale.py input.png -o upscaled.png --mode creative --prompt "enhance details"
     python upscale.py input.png -o upscaled.png --mode fast
+    python upscale.py photos/*.png -o upscaled/ -j 8
 
 Requirements:
     - STABILITY_API_KEY environment variable
@@ -15,14 +16,16 @@ Requirements:
 """
 
 import argparse
-import base64
-import json
 import os
 import sys
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from _stability import batch_output_paths, positive_int, post_image
+
+# Default number of images sent to the API at once in batch mode
+MAX_WORKERS = 4
+
 
 def upscale_image(
     image_path: str,
@@ -32,6 +35,7 @@ def upscale_image(
     creativity: float = 0.3,
     output_format: str = "png",
     api_key: str | None = None,
+    optimize: bool = False,
 ) -> dict:
     """Upscale an image using Stability AI."""
 
@@ -39,83 +43,59 @@ def upscale_image(
     if not api_key:
         return {"success": False, "error": "STABILITY_API_KEY environment variable not set"}
 
-    if not os.path.exists(image_path):
-        return {"success": False, "error": f"Image not found: {image_path}"}
+    # Form fields sent alongside the image
+    fields = {"output_format": output_format}
 
-    # Choose endpoint based on mode
+    # Choose endpoint based on mode; creative mode takes extra params
     if mode == "creative":
         url = "https://api.stability.ai/v2beta/stable-image/upscale/creative"
+        if prompt:
+            fields["prompt"] = prompt
+        fields["creativity"] = str(creativity)
     else:
         url = "https://api.stability.ai/v2beta/stable-image/upscale/fast"
 
-    # Build multipart form data
-    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-
-    with open(image_path, "rb") as f:
-        image_data = f.read()
-
-    # Build form data
-    body_parts = []
-
-    # Add image file
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="image"; filename="image.png"')
-    body_parts.append(b"Content-Type: image/png")
-    body_parts.append(b"")
-    body_parts.append(image_data)
+    result = post_image(url, fields, image_path, output_path, api_key, timeout=120, optimize=optimize)
+    if result["success"]:
+        result["mode"] = mode
+    return result
 
-    # Add output format
-    body_parts.append(f"--{boundary}".encode())
-    body_parts.append(b'Content-Disposition: form-data; name="output_format"')
-    body_parts.append(b"")
-    body_parts.append(output_format.encode())
 
-    # Add creative mode specific params
-    if mode == "creative":
-        if prompt:
-            body_parts.append(f"--{boundary}".encode())
-            body_parts.append(b'Content-Disposition: form-data; name="prompt"')
-            body_parts.append(b"")
-            body_parts.append(prompt.encode())
-
-        body_parts.append(f"--{boundary}".encode())
-        body_parts.append(b'Content-Disposition: form-data; name="creativity"')
-        body_parts.append(b"")
-        body_parts.append(str(creativity).encode())
-
-    body_parts.append(f"--{boundary}--".encode())
-    body_parts.append(b"")
-
-    body = b"\r\n".join(body_parts)
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Accept": "image/*",
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-    }
-
-    try:
-        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=120) as response:
-            # Save the image
-            with open(output_path, "wb") as f:
-                f.write(response.read())
-
-            return {
-                "success": True,
-                "output": output_path,
-                "mode": mode,
-            }
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        try:
-            error_json = json.loads(error_body)
-            error_msg = error_json.get("message", error_body)
-        except json.JSONDecodeError:
-            error_msg = error_body
-        return {"success": False, "error": f"API error ({e.code}): {error_msg}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+def upscale_image_batch(
+    image_paths: list[str],
+    output_dir: str,
+    mode: str = "fast",
+    prompt: str | None = None,
+    creativity: float = 0.3,
+    output_format: str = "png",
+    api_key: str | None = None,
+    optimize: bool = False,
+    max_workers: int = MAX_WORKERS,
+) -> list[dict]:
+    """
+    Upscale several images concurrently.
+
+    Each result is saved in output_dir under the input file's stem, with the
+    output format as suffix; colliding stems get -2, -3, ... appended.
+    Returns one result dict per image, in order.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_paths = batch_output_paths(image_paths, output_dir, output_format)
+
+    def run(image_path: str, output_path: str) -> dict:
+        return upscale_image(
+            image_path=image_path,
+            output_path=output_path,
+            mode=mode,
+            prompt=prompt,
+            creativity=creativity,
+            output_format=output_format,
+            api_key=api_key,
+            optimize=optimize,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, image_paths, output_paths))
 
 
 def main():
@@ -132,11 +112,24 @@ Examples:
 
     # Creative upscale with custom creativity
     %(prog)s input.png -o upscaled.png --mode creative -c 0.5
+
+    # Batch: every PNG in a folder, 8 at a time
+    %(prog)s photos/*.png -o upscaled/ -j 8
         """
     )
 
-    parser.add_argument("image", help="Input image path")
-    parser.add_argument("-o", "--output", required=True, help="Output file path")
+    parser.add_argument("image", nargs="+", help="Input image path(s)")
+    parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="Output file path (a directory when several images are given)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=positive_int,
+        default=MAX_WORKERS,
+        help=f"Images processed at once when several are given (default: {MAX_WORKERS})"
+    )
     parser.add_argument(
         "-m", "--mode",
         choices=["fast", "creative"],
@@ -157,20 +150,50 @@ Examples:
         help="Output format (default: png)"
     )
     parser.add_argument("-k", "--api-key", help="Stability API key")
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Recompress PNG input losslessly before upload (helps on slow uplinks)"
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
     args = parser.parse_args()
 
+    if len(args.image) > 1:
+        print(f"Upscaling {len(args.image)} images...")
+
+        results = upscale_image_batch(
+            image_paths=args.image,
+            output_dir=args.output,
+            mode=args.mode,
+            prompt=args.prompt,
+            creativity=args.creativity,
+            output_format=args.format,
+            api_key=args.api_key,
+            optimize=args.optimize,
+            max_workers=args.jobs,
+        )
+
+        failed = 0
+        for image_path, result in zip(args.image, results):
+            if result["success"]:
+                print(f"Saved: {result['output']}")
+            else:
+                failed += 1
+                print(f"Error ({image_path}): {result['error']}", file=sys.stderr)
+        sys.exit(1 if failed else 0)
+
     print(f"Upscaling image ({args.mode} mode)...")
 
     result = upscale_image(
-        image_path=args.image,
+        image_path=args.image[0],
         output_path=args.output,
         mode=args.mode,
         prompt=args.prompt,
         creativity=args.creativity,
         output_format=args.format,
         api_key=args.api_key,
+        optimize=args.optimize,
     )
 
     if result["success"]: